@@ -1,22 +1,25 @@
 # backend/auth.py
+import hashlib
 import os
-from datetime import datetime, timedelta
-from typing import List
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from .schemas import SignupIn, LoginIn, TokenOut, UserOut
+from .schemas import SignupIn, LoginIn, TokenOut, RefreshIn, UserOut
 
 from .database import get_db
-from .models import User
-from .models import (
-    PickupLocation as PickupLocationModel,
-    TimeSlot as TimeSlotModel,
-)
+from .models import RefreshToken, User
+from . import ratelimit
+from .passwords import password_hasher
+from .reference_data import reference_data
+from .timeutil import as_utc
+from .user_cache import user_cache
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 # ------------------------------------------------------------------
@@ -25,17 +28,20 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-change-me")
 ALGORITHM  = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Sliding: every refresh issues a new token with a fresh lifetime
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
 
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# Same scheme for public endpoints that personalise output when a token is sent
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
-def hash_pw(password: str) -> str:
-    return pwd_ctx.hash(password)
+async def hash_pw(password: str) -> str:
+    return await password_hasher.hash(password)
 
 
-def verify_pw(password: str, hashed: str) -> bool:
-    return pwd_ctx.verify(password, hashed)
+async def verify_pw(password: str, hashed: str) -> bool:
+    return await password_hasher.verify(password, hashed)
 
 
 def create_token(data: dict, expires: int = ACCESS_TOKEN_EXPIRE_MINUTES):
@@ -44,6 +50,74 @@ def create_token(data: dict, expires: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def user_claims(user: User) -> dict:
+    """Token claims: ``uid`` keys the user cache; name/is_admin are for clients.
+
+    Authorisation still reads ``is_admin`` from the (cached) users row, so
+    a demotion takes effect without waiting for old tokens to expire.
+    """
+    return {"sub": user.email, "uid": user.id, "name": user.name, "is_admin": bool(user.is_admin)}
+
+
+def _refresh_digest(token: str) -> str:
+    # Refresh tokens are 256 random bits, so a plain fast hash is enough
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(db: AsyncSession, user_id: int, family: Optional[str] = None) -> str:
+    """Add a new refresh token row to *db* (caller commits) and return the raw token."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_refresh_digest(token),
+        family=family or secrets.token_hex(16),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+async def _find_refresh_token(db: AsyncSession, token: str) -> Optional[RefreshToken]:
+    res = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == _refresh_digest(token)))
+    return res.scalar_one_or_none()
+
+
+async def _revoke_family(db: AsyncSession, family: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family == family, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
+
+
+async def purge_refresh_tokens(db, user_id: Optional[int] = None) -> int:
+    """Delete refresh token rows that are no longer needed; return how many.
+
+    That is expired rows, and every row of a family with no live token left
+    (logged out or revoked for reuse).  Rotated tokens of a live family are
+    kept until they expire: presenting one is what reveals reuse.  *db* is a
+    session or connection; the caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    live_families = select(RefreshToken.family).where(
+        RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > now
+    )
+    scope = []
+    if user_id is not None:
+        live_families = live_families.where(RefreshToken.user_id == user_id)
+        scope.append(RefreshToken.user_id == user_id)
+    # Autoflush inserts a just-issued token first, so its family counts as live
+    result = await db.execute(
+        delete(RefreshToken)
+        .where(*scope, or_(RefreshToken.expires_at <= now, RefreshToken.family.not_in(live_families)))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _expired(expires_at: datetime) -> bool:
+    return as_utc(expires_at) <= datetime.now(timezone.utc)
+
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme),
@@ -56,57 +130,156 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str | None = payload.get("sub")
+        user_id: int | None = payload.get("uid")
         if email is None:
             raise cred_exc
     except JWTError:
         raise cred_exc
 
-    res = await db.execute(select(User).where(User.email == email))
+    if user_id is not None:
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+        res = await db.execute(select(User).where(User.id == user_id))
+    else:
+        # Tokens issued before ``uid`` was added only carry the email
+        res = await db.execute(select(User).where(User.email == email))
     user = res.scalar_one_or_none()
     if user is None:
         raise cred_exc
+    user_cache.put(user)
     return user
 
 
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
+
+
+async def get_optional_user(
+    db: AsyncSession = Depends(get_db),
+    token: str | None = Depends(optional_oauth2_scheme),
+) -> User | None:
+    """Like ``get_current_user`` but anonymous (``None``) instead of 401."""
+    if not token:
+        return None
+    try:
+        return await get_current_user(db=db, token=token)
+    except HTTPException:
+        return None
+
+
 # ------------------------------------------------------------------
 # Routes
 # ------------------------------------------------------------------
 @router.post("/register", response_model=TokenOut)
-async def register(data: SignupIn, db: AsyncSession = Depends(get_db)):
+async def register(data: SignupIn, request: Request, db: AsyncSession = Depends(get_db)):
     # ─── Normalise email (trim/ lower) ───────────────────────────
     email_normalized = data.email.strip().lower()
+    ratelimit.enforce([
+        (ratelimit.register_by_ip, ratelimit.client_ip(request)),
+        (ratelimit.register_by_email, email_normalized),
+    ])
 
-    # email unique?  (case-insensitive check)
-    res = await db.execute(select(User).where(User.email == email_normalized))
-    if res.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Email already in use")
-
-    # Create and persist the new user
+    # Create and persist the new user; the unique constraint on email
+    # rejects duplicates, including concurrent signups for the same address
     user = User(
         name=data.name.strip(),
         email=email_normalized,
-        hashed_pwd=hash_pw(data.password),
+        hashed_pwd=await hash_pw(data.password),
     )
     db.add(user)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already in use")
     await db.refresh(user)
 
-    token = create_token({"sub": user.email})
-    return TokenOut(access_token=token)
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
+
+    token = create_token(user_claims(user))
+    return TokenOut(access_token=token, refresh_token=refresh_token)
 
 
 @router.post("/login", response_model=TokenOut)
-async def login(form: OAuth2PasswordRequestForm = Depends(),
+async def login(request: Request,
+                form: OAuth2PasswordRequestForm = Depends(),
                 db: AsyncSession = Depends(get_db)):
 
     username_norm = form.username.strip().lower()
-    res = await db.execute(select(User).where(User.email == username_norm))
-    user = res.scalar_one_or_none()
-    if not user or not verify_pw(form.password, user.hashed_pwd):
+    ratelimit.enforce([
+        (ratelimit.login_by_ip, ratelimit.client_ip(request)),
+        (ratelimit.login_by_email, username_norm),
+    ])
+    res = await db.execute(select(User).where(func.lower(User.email) == username_norm))
+    user = res.scalars().first()
+    if not user or not await verify_pw(form.password, user.hashed_pwd):
         raise HTTPException(status_code=400, detail="Incorrect credentials")
 
-    token = create_token({"sub": user.email})
-    return TokenOut(access_token=token)
+    refresh_token = issue_refresh_token(db, user.id)
+    await purge_refresh_tokens(db, user.id)
+    await db.commit()
+
+    token = create_token(user_claims(user))
+    return TokenOut(access_token=token, refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=TokenOut)
+async def refresh(data: RefreshIn, db: AsyncSession = Depends(get_db)):
+    """Swap a refresh token for a new access token and a new refresh token.
+
+    Each refresh token works once.  Presenting one that was already
+    rotated means it leaked (or two clients raced), so the whole session is
+    revoked and the user has to log in again.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    stored = await _find_refresh_token(db, data.refresh_token)
+    if stored is None or _expired(stored.expires_at):
+        raise invalid
+
+    # Claim the token; of two concurrent refreshes only one gets the row
+    claimed = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
+    if claimed.rowcount == 0:
+        await _revoke_family(db, stored.family)
+        await db.commit()
+        raise invalid
+
+    user = user_cache.get(stored.user_id)
+    if user is None:
+        user = await db.get(User, stored.user_id)
+        if user is None:
+            raise invalid
+        user_cache.put(user)
+
+    refresh_token = issue_refresh_token(db, user.id, family=stored.family)
+    await purge_refresh_tokens(db, user.id)
+    await db.commit()
+    return TokenOut(access_token=create_token(user_claims(user)), refresh_token=refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshIn, db: AsyncSession = Depends(get_db)):
+    """Revoke the session behind a refresh token, including tokens rotated from it."""
+    stored = await _find_refresh_token(db, data.refresh_token)
+    if stored is not None:
+        await _revoke_family(db, stored.family)
+        await purge_refresh_tokens(db, stored.user_id)
+        await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/me", response_model=UserOut)
@@ -120,17 +293,15 @@ async def me(current: User = Depends(get_current_user)):
 
 
 @router.get("/pickup-locations")
-async def pickup_locations(db: AsyncSession = Depends(get_db)):
+async def pickup_locations(request: Request):
     """Return the list of available pickup locations."""
-    res = await db.execute(select(PickupLocationModel))
-    return res.scalars().all()
+    return await reference_data.response(request, "pickup_locations")
 
 
 @router.get("/time-slots")
-async def time_slots(db: AsyncSession = Depends(get_db)):
+async def time_slots(request: Request):
     """Return the list of allowed pickup time slots."""
-    res = await db.execute(select(TimeSlotModel))
-    return res.scalars().all()
+    return await reference_data.response(request, "time_slots")
 
 
 @router.get("/users", response_model=List[UserOut])
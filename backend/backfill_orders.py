@@ -0,0 +1,43 @@
+"""Fill ``orders.pickup_location_id`` / ``time_slot_id`` from the stored names.
+
+New orders get their ids when they are placed.  This covers orders written
+before the columns existed, or by a worker still running the old code
+during a deploy.  It only touches rows whose id is still NULL, so it is
+safe to run any number of times; the app runs it on every startup.  Names
+that match no location or slot stay NULL.
+
+    python -m backend.backfill_orders
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import select, update
+
+from .models import Order, PickupLocation, TimeSlot
+
+
+async def backfill_order_refs(conn) -> None:
+    """*conn* may be an AsyncConnection or AsyncSession."""
+    location_id = select(PickupLocation.id).where(PickupLocation.name == Order.pickup_location).scalar_subquery()
+    slot_id = select(TimeSlot.id).where(TimeSlot.time == Order.time_slot).scalar_subquery()
+    await conn.execute(
+        update(Order).where(Order.pickup_location_id.is_(None)).values(pickup_location_id=location_id)
+    )
+    await conn.execute(
+        update(Order).where(Order.time_slot_id.is_(None)).values(time_slot_id=slot_id)
+    )
+
+
+async def main() -> None:
+    from .database import engine
+
+    async with engine.begin() as conn:
+        await backfill_order_refs(conn)
+    await engine.dispose()
+    print("Order references backfilled.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
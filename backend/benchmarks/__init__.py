@@ -0,0 +1,4 @@
+"""Standalone performance scripts.  Run them from the repo root, e.g.
+
+    python -m backend.benchmarks.feed_query
+"""
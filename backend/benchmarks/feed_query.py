@@ -0,0 +1,143 @@
+"""Feed query benchmark: legacy joinedload chain vs. the batched feed loader.
+
+Seeds a throwaway SQLite database, then loads feed pages of 20 and 100 posts
+both ways and reports the number of SQL statements, the number of rows the
+database handed back, and the median latency.
+
+    python -m backend.benchmarks.feed_query [--posts 300] [--runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from backend.database import Base
+from backend.feed_loader import load_posts
+from backend.models import (
+    Comment as CommentModel,
+    Post as PostModel,
+    User as UserModel,
+    comment_likes,
+    post_likes,
+)
+
+
+async def seed(engine, n_posts: int, n_users: int = 60) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(UserModel), [
+            {"id": u, "name": f"user{u}", "email": f"user{u}@example.com", "password_hash": "x"}
+            for u in range(1, n_users + 1)
+        ])
+        await conn.execute(insert(PostModel), [
+            {"id": p, "content": f"post {p}", "author_id": p % n_users + 1}
+            for p in range(1, n_posts + 1)
+        ])
+
+        comments, c_likes, p_likes = [], [], []
+        cid = 0
+        for p in range(1, n_posts + 1):
+            for _ in range(6):
+                cid += 1
+                top = cid
+                comments.append({"id": top, "content": "c", "author_id": cid % n_users + 1, "post_id": p})
+                if top % 3 == 0:
+                    for _ in range(2):
+                        cid += 1
+                        comments.append({"id": cid, "content": "r", "author_id": cid % n_users + 1,
+                                         "post_id": p, "parent_id": top})
+            p_likes += [{"user_id": (p + k) % n_users + 1, "post_id": p} for k in range(15)]
+        for c in comments:
+            c_likes += [{"user_id": (c["id"] + k) % n_users + 1, "comment_id": c["id"]} for k in range(5)]
+
+        await conn.execute(insert(CommentModel), comments)
+        await conn.execute(insert(post_likes), p_likes)
+        await conn.execute(insert(comment_likes), c_likes)
+
+
+def legacy_query(limit: int):
+    return select(PostModel).options(
+        joinedload(PostModel.author),
+        joinedload(PostModel.comments).joinedload(CommentModel.author),
+        joinedload(PostModel.comments).joinedload(CommentModel.liked_by),
+        joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.author),
+        joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.liked_by),
+        joinedload(PostModel.liked_by)
+    ).order_by(PostModel.created_at.desc(), PostModel.id.desc()).limit(limit)
+
+
+async def run_legacy(session, limit: int):
+    result = await session.execute(legacy_query(limit))
+    return result.unique().scalars().all()
+
+
+async def run_loader(session, limit: int):
+    query = select(PostModel).order_by(PostModel.created_at.desc(), PostModel.id.desc()).limit(limit)
+    return await load_posts(session, query)
+
+
+def count_rows(db_path: str, statements) -> int:
+    # Re-run the captured SQL on a plain sqlite3 connection: the ORM drains
+    # the cursor itself, so this is the only reliable way to see row counts.
+    conn = sqlite3.connect(db_path)
+    try:
+        return sum(len(conn.execute(sql, params).fetchall()) for sql, params in statements)
+    finally:
+        conn.close()
+
+
+async def measure(engine, db_path: str, fn, limit: int, runs: int):
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with sessionmaker() as session:
+            posts = await fn(session, limit)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    assert len(posts) == limit
+
+    timings = []
+    for _ in range(runs):
+        async with sessionmaker() as session:
+            start = time.perf_counter()
+            await fn(session, limit)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return len(captured), count_rows(db_path, captured), statistics.median(timings)
+
+
+async def main(n_posts: int, runs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        await seed(engine, n_posts)
+
+        print(f"{'strategy':<10} {'page':>5} {'queries':>8} {'rows':>10} {'median ms':>10}")
+        for limit in (20, 100):
+            for name, fn in (("joinedload", run_legacy), ("loader", run_loader)):
+                queries, rows, ms = await measure(engine, db_path, fn, limit, runs)
+                print(f"{name:<10} {limit:>5} {queries:>8} {rows:>10} {ms:>10.1f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.posts, args.runs))
@@ -0,0 +1,102 @@
+"""Feed latency while a burst of logins is in flight.
+
+Starts the app in-process against a throwaway SQLite database, fires
+``--logins`` concurrent logins, and meanwhile polls GET /api/social/posts
+every few milliseconds.  It does this twice: once with bcrypt run inline on
+the event loop (the old behaviour) and once through the password pool.  The
+report shows feed latency percentiles and how long the burst took.
+
+Needs httpx.
+
+    python -m backend.benchmarks.login_burst [--logins 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="login-burst-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+# The burst is one client logging in as one user; keep the throttle out of it
+os.environ["LOGIN_RATE_PER_IP_PER_MINUTE"] = "1000000"
+os.environ["LOGIN_RATE_PER_EMAIL_PER_MINUTE"] = "1000000"
+
+import httpx  # noqa: E402
+
+from backend import auth  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.passwords import password_hasher, pwd_ctx  # noqa: E402
+
+
+class InlineHasher:
+    """The pre-pool behaviour: bcrypt called directly on the event loop."""
+
+    async def hash(self, password: str) -> str:
+        return pwd_ctx.hash(password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return pwd_ctx.verify(password, hashed)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def burst(client: httpx.AsyncClient, logins: int) -> tuple:
+    done = asyncio.Event()
+    latencies = []
+
+    async def poll_feed():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/api/social/posts", params={"limit": 20})
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.005)
+
+    async def login():
+        await client.post("/api/auth/login", data={"username": "bench@example.com", "password": "password1"})
+
+    poller = asyncio.create_task(poll_feed())
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await poller
+    return latencies, elapsed
+
+
+async def main(logins: int) -> None:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            r = await client.post("/api/auth/register", json={
+                "name": "bench", "email": "bench@example.com", "password": "password1",
+            })
+            token = r.json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            for i in range(20):
+                await client.post("/api/social/posts", json={"content": f"post {i}"}, headers=headers)
+
+            print(f"{logins} concurrent logins, {password_hasher.workers} hash workers")
+            print(f"{'mode':8} {'polls':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'burst s':>8}")
+            for mode, hasher in (("inline", InlineHasher()), ("pool", password_hasher)):
+                auth.password_hasher = hasher
+                latencies, elapsed = await burst(client, logins)
+                print(
+                    f"{mode:8} {len(latencies):6d} {statistics.median(latencies):8.1f} "
+                    f"{percentile(latencies, 0.95):8.1f} {max(latencies):8.1f} {elapsed:8.2f}"
+                )
+            auth.password_hasher = password_hasher
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
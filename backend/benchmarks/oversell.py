@@ -0,0 +1,91 @@
+"""Concurrency check: hundreds of simultaneous orders for the last few items.
+
+Starts the app in-process against a throwaway SQLite database (or
+``--database-url``), stocks one menu item with ``--stock`` units, then fires
+``--orders`` concurrent POST /api/orders.  Exactly ``--stock`` orders must
+succeed, every other one must be rejected with 409, the item must end at
+zero and off the menu.  Exits non-zero if any of that fails.
+
+Needs httpx.
+
+    python -m backend.benchmarks.oversell [--orders 300] [--stock 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import os
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--orders", type=int, default=300)
+parser.add_argument("--stock", type=int, default=10)
+parser.add_argument("--database-url", default=None)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='oversell-')}/bench.db"
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select, update  # noqa: E402
+
+from backend.database import AsyncSessionLocal  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.models import MenuItem, Order, User  # noqa: E402
+
+
+async def main() -> int:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            r = await client.post("/api/auth/register", json={
+                "name": "organizer", "email": "organizer@example.com", "password": "password1",
+            })
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(User).values(is_admin=True))
+                await db.commit()
+
+            r = await client.post("/api/menu", headers=headers, json={
+                "name": "Last call dogs", "price": "$5", "stock_remaining": args.stock,
+            })
+            item_id = r.json()["id"]
+
+            async def order():
+                return await client.post("/api/orders", headers=headers, json={
+                    "menu_item_id": item_id, "pickup_location": "White Plaza", "time_slot": "9:30 PM - 10:30 PM",
+                })
+
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(order() for _ in range(args.orders)))
+            elapsed = time.perf_counter() - start
+
+            codes = collections.Counter(r.status_code for r in responses)
+            menu = {item["id"] for item in (await client.get("/api/menu/today")).json()}
+
+        async with AsyncSessionLocal() as db:
+            remaining, available = (await db.execute(
+                select(MenuItem.stock_remaining, MenuItem.is_available).where(MenuItem.id == item_id)
+            )).one()
+            placed = await db.scalar(select(func.count()).select_from(Order).where(Order.menu_item_id == item_id))
+
+    print(f"{args.orders} concurrent orders for {args.stock} units in {elapsed:.2f}s")
+    print(f"responses {dict(sorted(codes.items()))}, orders stored {placed}, "
+          f"stock left {remaining}, available {available}, on menu {item_id in menu}")
+    ok = (
+        codes[201] == args.stock
+        and codes[409] == args.orders - args.stock
+        and placed == args.stock
+        and remaining == 0
+        and not available
+        and item_id not in menu
+    )
+    print("OK" if ok else "OVERSOLD OR MISCOUNTED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,97 @@
+"""Serialization cost of one 100-post feed page.
+
+Compares the old path (``model_validate`` in the handler, then FastAPI
+validating again against ``response_model`` and rendering through
+``jsonable_encoder``) with the orjson fast path, both cold and with the
+per-post byte cache warm.
+
+    python -m backend.benchmarks.serialization [--posts 100] [--comments 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from backend.models import Comment as CommentModel, Post as PostModel, User as UserModel
+from backend.schemas import PostWithLikeStatus
+from backend.serialization import BytesCache, json_array, post_json
+from backend import serialization
+
+
+def build_page(n_posts: int, n_comments: int) -> List[PostModel]:
+    """Transient ORM objects shaped like a loaded feed page."""
+    now = datetime(2025, 5, 1, 21, 30)
+    users = [
+        UserModel(id=u, name=f"user{u}", email=f"user{u}@example.com", is_admin=False, created_at=now)
+        for u in range(1, 21)
+    ]
+    posts = []
+    cid = 0
+    for p in range(1, n_posts + 1):
+        post = PostModel(
+            id=p, content=f"post {p} " * 10, author_id=users[p % 20].id, author=users[p % 20],
+            likes_count=p % 7, comments_count=n_comments, version=1,
+            created_at=now - timedelta(minutes=p),
+        )
+        comments = []
+        for _ in range(n_comments):
+            cid += 1
+            comments.append(CommentModel(
+                id=cid, content="nice " * 5, author_id=users[cid % 20].id, author=users[cid % 20],
+                post_id=p, likes_count=cid % 3, created_at=now, replies=[],
+            ))
+        post.comments = comments
+        posts.append(post)
+    return posts
+
+
+def timed(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(n_posts: int, n_comments: int, runs: int) -> None:
+    orm_posts = build_page(n_posts, n_comments)
+    field = create_response_field(name="Response_get_posts", type_=List[PostWithLikeStatus])
+
+    def legacy():
+        data = [PostWithLikeStatus.model_validate(p) for p in orm_posts]
+        content = asyncio.run(serialize_response(field=field, response_content=data))
+        return JSONResponse(content).body
+
+    validated = [PostWithLikeStatus.model_validate(p) for p in orm_posts]
+
+    def fast_cold():
+        serialization.post_bytes = BytesCache(max_entries=4096)
+        return json_array(post_json(p) for p in validated)
+
+    def fast_warm():
+        return json_array(post_json(p) for p in validated)
+
+    fast_warm()  # prime the byte cache
+    print(f"{n_posts} posts x {n_comments} comments, median of {runs} runs")
+    print(f"  validate twice + jsonable_encoder : {timed(legacy, runs):8.2f} ms")
+    print(f"  orjson, byte cache cold           : {timed(fast_cold, runs):8.2f} ms")
+    print(f"  orjson, byte cache warm           : {timed(fast_warm, runs):8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--comments", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+    main(args.posts, args.comments, args.runs)
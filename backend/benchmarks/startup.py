@@ -0,0 +1,101 @@
+"""Cold-start cost: import time and time to the first response.
+
+Each run is a fresh interpreter, like a worker booting on Render.  It
+reports:
+- how long ``import backend.main`` takes;
+- how long until the lifespan startup has finished and GET / has
+  answered, against a throwaway SQLite database;
+- whether the Google client stack was loaded on that path.
+
+At the end it lists the slowest packages to import, from
+``python -X importtime``.  Run it with and without the Sheets env vars
+set.
+
+Needs httpx.
+
+    python -m backend.benchmarks.startup [--runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def child() -> None:
+    start = time.perf_counter()
+    from backend.main import app
+
+    imported = time.perf_counter()
+    import asyncio
+
+    import httpx
+
+    async def first_response() -> int:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                status = (await client.get("/")).status_code
+                timings["first_response"] = time.perf_counter() - start
+                timings["google_loaded"] = "googleapiclient" in sys.modules
+                return status
+
+    timings = {"import": imported - start}
+    timings["status"] = asyncio.run(first_response())
+    print(json.dumps(timings))
+
+
+def run_child(env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.startup", "--child"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    """Slowest packages to import, by the cumulative time of their first import."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    packages: dict = {}
+    for line in err.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| +(\S+)", line)
+        if match and match.group(2) != "backend.main":
+            name = match.group(2)
+            package = ".".join(name.split(".")[:2]) if name.startswith("backend.") else name.split(".")[0]
+            packages[package] = max(packages.get(package, 0), int(match.group(1)))
+    return sorted(((micros, name) for name, micros in packages.items()), reverse=True)[:top]
+
+
+def main(runs: int) -> None:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='startup-')}/bench.db"
+    results = [run_child(env) for _ in range(runs)]
+    ms = lambda key: statistics.median(r[key] for r in results) * 1000  # noqa: E731
+    print(f"{runs} cold starts (median)")
+    print(f"  import backend.main   {ms('import'):8.1f} ms")
+    print(f"  first response        {ms('first_response'):8.1f} ms")
+    print(f"  google client loaded before first response: {any(r['google_loaded'] for r in results)}")
+    print("slowest packages to import (cumulative):")
+    for micros, module in slowest_imports(env, 10):
+        print(f"  {micros / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+        parser.add_argument("--runs", type=int, default=5)
+        main(parser.parse_args().runs)
@@ -0,0 +1,57 @@
+"""Idempotent first-run data: default menu item, pickup locations, time slots.
+
+Runs once from the app lifespan, before the reference-data snapshot loads,
+so request handlers never write.  A table is only seeded while it is empty,
+and rows go in with ``INSERT ... ON CONFLICT DO NOTHING`` against the
+table's unique natural key: workers starting at the same time cannot create
+duplicates, and defaults an admin has since deleted are not brought back.
+
+The defaults live in ``bootstrap_data.json`` next to this module; point
+``BOOTSTRAP_DATA_FILE`` at another file to seed a different event.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .database import insert_ignoring_duplicates
+from .models import MenuItem, PickupLocation, TimeSlot
+
+LOGGER = logging.getLogger(__name__)
+
+DATA_FILE = os.getenv("BOOTSTRAP_DATA_FILE", str(Path(__file__).with_name("bootstrap_data.json")))
+
+# Section of the data file -> table it seeds
+TABLES = {
+    "menu_items": MenuItem.__table__,
+    "pickup_locations": PickupLocation.__table__,
+    "time_slots": TimeSlot.__table__,
+}
+
+
+def load_defaults(path: str = DATA_FILE) -> Dict[str, List[dict]]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    unknown = sorted(set(data) - set(TABLES))
+    if unknown:
+        raise ValueError(f"{path}: unknown sections {unknown}; expected {sorted(TABLES)}")
+    return data
+
+
+async def bootstrap(conn: AsyncConnection, defaults: Optional[Dict[str, List[dict]]] = None) -> None:
+    """Seed every empty reference table from *defaults* (the data file by default)."""
+    if defaults is None:
+        defaults = load_defaults()
+    for section, rows in defaults.items():
+        table = TABLES[section]
+        if not rows or (await conn.execute(select(table.c.id).limit(1))).first():
+            continue
+        await conn.execute(insert_ignoring_duplicates(table, conn.dialect.name), rows)
+        LOGGER.info("Seeded %d default %s", len(rows), section)
@@ -1,5 +1,7 @@
 # backend/database.py
 import os
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
@@ -39,3 +41,12 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncSession:          # dependency
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def insert_ignoring_duplicates(table: Table, dialect_name: str):
+    """``INSERT ... ON CONFLICT DO NOTHING`` for the dialects we deploy on."""
+    if dialect_name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect_name == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    raise NotImplementedError(f"No upsert support for {dialect_name}")
@@ -0,0 +1,173 @@
+"""In-process cache for GET /api/social/posts pages.
+
+During a gathering hundreds of phones poll the same location feed every few
+seconds, so pages are cached per ``(location_filter, cursor, limit)`` in a
+bounded LRU.  Entries are fresh for ``FEED_CACHE_TTL`` seconds and may then be
+served stale for up to ``FEED_CACHE_STALE_TTL`` more seconds while a single
+background task rebuilds them.
+
+Cached pages are viewer-independent (every ``is_liked_by_user`` is False);
+callers copy the page and resolve the viewer's likes on top.  Write handlers
+invalidate exactly the entries their change can affect.  The cache is per
+worker process, so other workers converge within the TTL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .schemas import PostPage
+from .singleflight import reads
+
+LOGGER = logging.getLogger(__name__)
+
+# (location_filter, cursor, limit); location None means the unfiltered feed
+FeedKey = Tuple[Optional[str], Optional[str], int]
+PageLoader = Callable[[AsyncSession], Awaitable[PostPage]]
+
+
+@dataclass
+class _Entry:
+    page: PostPage
+    post_ids: FrozenSet[int]
+    fresh_until: float
+    stale_until: float
+
+
+Predicate = Callable[[FeedKey, _Entry], bool]
+
+
+class FeedCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 5.0, stale_ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[FeedKey, _Entry]" = OrderedDict()
+        self._refreshing: Dict[FeedKey, asyncio.Task] = {}
+        # Recent invalidations, replayed against pages whose load raced them
+        self._generation = 0
+        self._recent_drops: "deque[Tuple[int, Predicate]]" = deque(maxlen=1024)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    # ── reads ────────────────────────────────────────────────────────
+    async def get_or_load(self, key: FeedKey, loader: PageLoader) -> PostPage:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._schedule_refresh(key, loader)
+            return entry.page
+
+        self.misses += 1
+        return await self._load(key, loader)
+
+    async def _load(self, key: FeedKey, loader: PageLoader) -> PostPage:
+        async def flight(session: AsyncSession) -> PostPage:
+            generation = self._generation
+            page = await loader(session)
+            self._store(key, page, generation)
+            return page
+
+        # Concurrent misses for the same page share one query.  The
+        # generation is part of the flight key so a request arriving after
+        # a write never joins a load that started before it.
+        return await reads.do(("feed", self._generation, *key), flight)
+
+    def _schedule_refresh(self, key: FeedKey, loader: PageLoader) -> None:
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: FeedKey, loader: PageLoader) -> None:
+        try:
+            await self._load(key, loader)
+        except Exception:
+            LOGGER.exception("Background feed refresh failed for %s", key)
+            return
+        self.refreshes += 1
+
+    def _store(self, key: FeedKey, page: PostPage, generation: int) -> None:
+        now = time.monotonic()
+        entry = _Entry(
+            page=page,
+            post_ids=frozenset(post.id for post in page.items),
+            fresh_until=now + self.ttl,
+            stale_until=now + self.ttl + self.stale_ttl,
+        )
+        # A write that committed while this page was loading may not be in it
+        if generation < self._generation:
+            if not self._recent_drops or self._recent_drops[0][0] > generation + 1:
+                return  # too old to replay, play it safe
+            if any(gen > generation and predicate(key, entry) for gen, predicate in self._recent_drops):
+                return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ── invalidation ─────────────────────────────────────────────────
+    def _drop(self, predicate: Predicate) -> None:
+        self._generation += 1
+        self._recent_drops.append((self._generation, predicate))
+        stale = [key for key, entry in self._entries.items() if predicate(key, entry)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def post_created(self, location_filter: Optional[str]) -> None:
+        """A new post only lands on first pages; cursor pages sit below it."""
+        self._drop(
+            lambda key, _: key[1] is None and _shows_location(key[0], location_filter)
+        )
+
+    def post_moved(self, location_filter: Optional[str]) -> None:
+        """A post moved into *location_filter*: any page of that feed may now include it."""
+        self._drop(lambda key, _: _shows_location(key[0], location_filter))
+
+    def post_changed(self, post_id: int) -> None:
+        """Content, comments or likes of a post changed (or it was deleted)."""
+        self._drop(lambda _, entry: post_id in entry.post_ids)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+def _shows_location(feed_location: Optional[str], post_location: Optional[str]) -> bool:
+    # Unfiltered feeds show everything, and location-less posts show everywhere
+    return feed_location is None or post_location is None or feed_location == post_location
+
+
+feed_cache = FeedCache(
+    max_entries=int(os.getenv("FEED_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("FEED_CACHE_TTL", "5")),
+    stale_ttl=float(os.getenv("FEED_CACHE_STALE_TTL", "30")),
+)
@@ -0,0 +1,302 @@
+"""Shared eager-loading for the social feed.
+
+Posts are rendered with a short preview of their thread rather than every
+comment: the first ``FEED_COMMENT_PREVIEW`` top-level comments, each with its
+``replies_count`` and no nested replies.  The rest of a thread is fetched on
+demand, a page at a time, via ``load_comment_page``, optionally with whole
+reply subtrees below each comment (``attach_subtrees``, one recursive CTE).  Previews for a whole
+page of posts come from one windowed query, so the feed's payload and query
+count stay flat however busy a thread gets.
+
+Previews are attached with ``set_committed_value`` and are deliberately
+partial collections; sessions that go on to delete through these
+relationships should load them afresh.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from typing import (
+    Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple,
+)
+
+from sqlalchemy import Integer, Select, func, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .like_buffer import like_buffer
+from .models import Comment as CommentModel, Post as PostModel, comment_likes, post_likes
+from .pagination import after_cursor, encode_cursor
+from .schemas import Comment, PostWithLikeStatus
+
+COMMENT_PREVIEW = int(os.getenv("FEED_COMMENT_PREVIEW", "3"))
+# Deepest reply subtree a single request may ask for
+MAX_THREAD_DEPTH = 10
+
+THREAD_ORDER = (CommentModel.created_at.asc(), CommentModel.id.asc())
+
+
+def post_feed_options():
+    """Loader options for rendering a post; comments come from ``attach_comment_previews``.
+
+    Likers are never loaded: counts are stored on the rows and the viewer's
+    own likes come from ``resolve_like_status``.
+    """
+    return (joinedload(PostModel.author),)
+
+
+def _next_cursor(rows: List[CommentModel], limit: int) -> Optional[str]:
+    if len(rows) <= limit:
+        return None
+    return encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id)
+
+
+async def _first_comments(
+    db: AsyncSession, group_col, group_ids: Collection[int], *criteria, per_group: int
+) -> Dict[int, List[CommentModel]]:
+    """The first ``per_group + 1`` comments of each group, in thread order.
+
+    One query for every group: rows are ranked within their group by a
+    window function and cut off at the rank we need.
+    """
+    if not group_ids:
+        return {}
+    ranked = (
+        select(
+            CommentModel.id,
+            func.row_number().over(partition_by=group_col, order_by=THREAD_ORDER).label("rank"),
+        )
+        .where(group_col.in_(group_ids), *criteria)
+        .subquery()
+    )
+    result = await db.execute(
+        select(CommentModel)
+        .join(ranked, ranked.c.id == CommentModel.id)
+        .where(ranked.c.rank <= per_group + 1)
+        .order_by(*THREAD_ORDER)
+        .options(joinedload(CommentModel.author))
+    )
+    groups: Dict[int, List[CommentModel]] = defaultdict(list)
+    key = group_col.key
+    for comment in result.scalars():
+        groups[getattr(comment, key)].append(comment)
+    return groups
+
+
+async def attach_thread_info(db: AsyncSession, comments: Sequence[CommentModel]) -> None:
+    """Set ``replies_count`` on *comments* and leave their replies unloaded (empty)."""
+    counts: Dict[int, int] = {}
+    if comments:
+        result = await db.execute(
+            select(CommentModel.parent_id, func.count(CommentModel.id))
+            .where(CommentModel.parent_id.in_({c.id for c in comments}))
+            .group_by(CommentModel.parent_id)
+        )
+        counts = dict(result.all())
+    for comment in comments:
+        comment.replies_count = counts.get(comment.id, 0)
+        set_committed_value(comment, "replies", [])
+
+
+async def attach_comment_previews(db: AsyncSession, posts: Sequence[PostModel]) -> None:
+    """Give each post its first top-level comments and a cursor for the rest."""
+    groups = await _first_comments(
+        db,
+        CommentModel.post_id,
+        {post.id for post in posts},
+        CommentModel.parent_id.is_(None),
+        per_group=COMMENT_PREVIEW,
+    )
+    preview = []
+    for post in posts:
+        rows = groups.get(post.id, [])
+        post.comments_next_cursor = _next_cursor(rows, COMMENT_PREVIEW)
+        set_committed_value(post, "comments", rows[:COMMENT_PREVIEW])
+        preview += rows[:COMMENT_PREVIEW]
+    await attach_thread_info(db, preview)
+
+
+async def attach_reply_previews(db: AsyncSession, comments: Sequence[CommentModel]) -> None:
+    """Like ``attach_comment_previews``, one level down: first replies of each comment."""
+    groups = await _first_comments(
+        db, CommentModel.parent_id, {c.id for c in comments}, per_group=COMMENT_PREVIEW
+    )
+    await attach_thread_info(db, comments)
+    preview = []
+    for comment in comments:
+        rows = groups.get(comment.id, [])
+        comment.replies_next_cursor = _next_cursor(rows, COMMENT_PREVIEW)
+        set_committed_value(comment, "replies", rows[:COMMENT_PREVIEW])
+        preview += rows[:COMMENT_PREVIEW]
+    await attach_thread_info(db, preview)
+
+
+async def attach_subtrees(db: AsyncSession, roots: Sequence[CommentModel], depth: int) -> None:
+    """Attach up to *depth* levels of replies below each of *roots*.
+
+    The subtree comes back from a single recursive CTE (SQLite and Postgres
+    alike), already in thread order, and is linked up through one
+    ``parent_id`` lookup per row.  Comments on the deepest level get only
+    their ``replies_count``.
+    """
+    if depth <= 0 or not roots:
+        await attach_thread_info(db, roots)
+        return
+
+    # literal_column so Postgres types the level as integer, not an untyped bind
+    thread = (
+        select(CommentModel.id, literal_column("0", Integer).label("level"))
+        .where(CommentModel.id.in_({root.id for root in roots}))
+        .cte("thread", recursive=True)
+    )
+    thread = thread.union_all(
+        select(CommentModel.id, thread.c.level + 1)
+        .where(CommentModel.parent_id == thread.c.id, thread.c.level < depth)
+    )
+    result = await db.execute(
+        select(CommentModel, thread.c.level)
+        .join(thread, thread.c.id == CommentModel.id)
+        .where(thread.c.level > 0)
+        .order_by(*THREAD_ORDER)
+        .options(joinedload(CommentModel.author))
+    )
+
+    children: Dict[int, List[CommentModel]] = defaultdict(list)
+    inner: List[CommentModel] = list(roots)
+    frontier: List[CommentModel] = []
+    for comment, level in result.tuples():
+        children[comment.parent_id].append(comment)
+        (frontier if level == depth else inner).append(comment)
+    for comment in inner:
+        replies = children.get(comment.id, [])
+        comment.replies_count = len(replies)
+        set_committed_value(comment, "replies", replies)
+    await attach_thread_info(db, frontier)
+
+
+async def load_posts(db: AsyncSession, query: Select) -> List[PostModel]:
+    """Execute a ``select(Post)`` query and eager-load everything the feed renders."""
+    result = await db.execute(query.options(*post_feed_options()))
+    posts = list(result.scalars().all())
+    await attach_comment_previews(db, posts)
+    return posts
+
+
+async def load_post(db: AsyncSession, post_id: int) -> Optional[PostModel]:
+    posts = await load_posts(db, select(PostModel).filter(PostModel.id == post_id))
+    return posts[0] if posts else None
+
+
+async def load_comment(
+    db: AsyncSession, comment_id: int, depth: Optional[int] = None
+) -> Optional[CommentModel]:
+    """A single comment with its author and either a preview of its replies
+    or, given *depth*, its full reply subtree that many levels deep."""
+    result = await db.execute(
+        select(CommentModel)
+        .options(joinedload(CommentModel.author))
+        .filter(CommentModel.id == comment_id)
+    )
+    comment = result.scalar_one_or_none()
+    if comment is None:
+        return None
+    if depth is None:
+        await attach_reply_previews(db, [comment])
+    else:
+        await attach_subtrees(db, [comment], depth)
+    return comment
+
+
+def thread_query(post_id: Optional[int] = None, parent_id: Optional[int] = None) -> Select:
+    """Top-level comments of a post, or the direct replies to a comment."""
+    query = select(CommentModel)
+    if parent_id is not None:
+        query = query.filter(CommentModel.parent_id == parent_id)
+    else:
+        query = query.filter(CommentModel.post_id == post_id, CommentModel.parent_id.is_(None))
+    return query
+
+
+async def load_comment_page(
+    db: AsyncSession, query: Select, position, limit: int, depth: int = 0
+) -> Tuple[List[CommentModel], Optional[str]]:
+    """One keyset page of a thread, oldest first, plus the cursor for the next.
+
+    With *depth* each comment also carries its replies that many levels down.
+    """
+    if position is not None:
+        query = query.filter(
+            after_cursor(CommentModel.created_at, CommentModel.id, position, db.bind.dialect.name)
+        )
+    result = await db.execute(
+        query.order_by(*THREAD_ORDER).limit(limit + 1).options(joinedload(CommentModel.author))
+    )
+    rows = list(result.scalars().all())
+    next_cursor = _next_cursor(rows, limit)
+    comments = rows[:limit]
+    await attach_subtrees(db, comments, depth)
+    return comments, next_cursor
+
+
+def iter_comments(comments: Iterable[Comment]) -> Iterator[Comment]:
+    """Yield serialised comments and, depth first, all of their replies."""
+    for comment in comments:
+        yield comment
+        yield from iter_comments(comment.replies)
+
+
+async def fetch_liked_ids(
+    db: AsyncSession,
+    viewer_id: Optional[int],
+    post_ids: Collection[int] = (),
+    comment_ids: Collection[int] = (),
+) -> Tuple[Set[int], Set[int]]:
+    """Return the subsets of *post_ids* and *comment_ids* the viewer has liked.
+
+    Answered by a single ``IN`` query over the post_likes/comment_likes
+    primary keys, plus any of the viewer's post likes still in the
+    write-behind buffer.
+    """
+    if viewer_id is None:
+        return set(), set()
+    parts = []
+    if post_ids:
+        parts.append(
+            select(literal("post").label("kind"), post_likes.c.post_id.label("target_id"))
+            .where(post_likes.c.user_id == viewer_id, post_likes.c.post_id.in_(post_ids))
+        )
+    if comment_ids:
+        parts.append(
+            select(literal("comment").label("kind"), comment_likes.c.comment_id.label("target_id"))
+            .where(comment_likes.c.user_id == viewer_id, comment_likes.c.comment_id.in_(comment_ids))
+        )
+    if not parts:
+        return set(), set()
+
+    result = await db.execute(parts[0] if len(parts) == 1 else union_all(*parts))
+    liked_posts, liked_comments = set(), set()
+    for kind, target_id in result:
+        (liked_posts if kind == "post" else liked_comments).add(target_id)
+    if like_buffer.enabled:
+        like_buffer.overlay(viewer_id, post_ids, liked_posts)
+    return liked_posts, liked_comments
+
+
+async def resolve_like_status(
+    db: AsyncSession,
+    viewer_id: Optional[int],
+    posts: Sequence[PostWithLikeStatus] = (),
+    comments: Sequence[Comment] = (),
+) -> None:
+    """Set ``is_liked_by_user`` on serialised posts/comments and all their replies."""
+    all_comments = list(iter_comments([c for p in posts for c in p.comments]))
+    all_comments += iter_comments(comments)
+    liked_posts, liked_comments = await fetch_liked_ids(
+        db, viewer_id, {p.id for p in posts}, {c.id for c in all_comments}
+    )
+    for post in posts:
+        post.is_liked_by_user = post.id in liked_posts
+    for comment in all_comments:
+        comment.is_liked_by_user = comment.id in liked_comments
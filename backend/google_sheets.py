@@ -24,79 +24,152 @@ If credentials are not supplied the module logs a warning and becomes a no-op
 so that the rest of the API still works in local development.
 """
 
+import importlib.util
 import json
 import os
 import logging
+import threading
 from datetime import datetime
 from typing import Sequence
 
-# Import Google client libraries lazily / defensively so the whole API still
-# starts even if the optional dependency isn't installed in the current env.
+from .timeutil import as_utc
 
-try:
-    from google.oauth2 import service_account  # type: ignore
-    from googleapiclient.discovery import build  # type: ignore
-    from googleapiclient.discovery import Resource  # type: ignore
-
-except ModuleNotFoundError:  # pragma: no cover – optional dependency
-    service_account = None  # type: ignore
-    build = None  # type: ignore
-    Resource = None  # type: ignore
+# The Google client stack is slow to import and building the service reads
+# credentials from disk, so neither happens at import time: ``client()``
+# builds the service on first use (or from the lifespan's background
+# warm-up), and ``is_configured()`` only looks at env vars and paths.  The
+# whole API still starts if the optional dependency isn't installed.
 
 LOGGER = logging.getLogger(__name__)
 
 SCOPES = ("https://www.googleapis.com/auth/spreadsheets",)
+SHEET_NAME = "Sheet1"
+
+_sheet_id = os.getenv("GOOGLE_SHEET_ID")
+_configured: bool | None = None
+_service = None  # built by client()
+_service_lock = threading.Lock()
 
 
-def _get_credentials():
-    if service_account is None:
-        LOGGER.warning("google-auth libraries not installed; Google Sheets disabled")
-        return None
+def _credentials_source() -> tuple[str, str] | None:
+    """``("info", json)`` or ``("file", path)``, found without importing google-auth."""
     json_str = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
     if json_str:
-        info = json.loads(json_str)
-        return service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
+        return "info", json_str
 
     path = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
     if path and os.path.exists(path):
-        return service_account.Credentials.from_service_account_file(path, scopes=SCOPES)
+        return "file", path
 
     # Fallback: look for a *.json credential file in the same directory
     default_path = os.path.join(os.path.dirname(__file__), "service_account.json")
     if os.path.exists(default_path):
-        return service_account.Credentials.from_service_account_file(default_path, scopes=SCOPES)
-
-    LOGGER.warning("Google credentials not configured; Google Sheets writes are disabled")
+        return "file", default_path
     return None
 
 
-_creds = _get_credentials()
-_service: Resource | None = (
-    build("sheets", "v4", credentials=_creds, cache_discovery=False) if (_creds and build) else None
-)
-_sheet_id = os.getenv("GOOGLE_SHEET_ID")
+def is_configured() -> bool:
+    """Sheet id, credentials and client libraries are all present.  Cheap; cached."""
+    global _configured
+    if _configured is None:
+        if importlib.util.find_spec("googleapiclient") is None or importlib.util.find_spec("google.oauth2") is None:
+            LOGGER.warning("google-auth libraries not installed; Google Sheets disabled")
+            _configured = False
+        elif _credentials_source() is None:
+            LOGGER.warning("Google credentials not configured; Google Sheets writes are disabled")
+            _configured = False
+        else:
+            _configured = bool(_sheet_id)
+    return _configured
 
 
-def append_row(values: Sequence[str]):
-    """Append a single row to the configured sheet.
+def _build():
+    from google.oauth2 import service_account  # type: ignore
+    from googleapiclient.discovery import build  # type: ignore
+
+    kind, value = _credentials_source()
+    if kind == "info":
+        creds = service_account.Credentials.from_service_account_info(json.loads(value), scopes=SCOPES)
+    else:
+        creds = service_account.Credentials.from_service_account_file(value, scopes=SCOPES)
+    return build("sheets", "v4", credentials=creds, cache_discovery=False)
 
-    No-op if credentials/sheet id are missing.  Raises exceptions from the
-    Google API otherwise.
+
+def client():
+    """The Sheets service, built on first call.  Blocking; raises if the build fails."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = _build()
+    return _service
+
+
+def warm_up() -> None:
+    """Build the client ahead of the first order; run it in a background thread."""
+    if not is_configured():
+        return
+    try:
+        client()
+    except Exception:
+        LOGGER.exception("Google Sheets client initialisation failed; will retry on first use")
+
+
+def values_resource():
+    """The ``spreadsheets().values()`` resource, or None if not configured."""
+    return client().spreadsheets().values() if is_configured() else None
+
+
+def sheet_id() -> str | None:
+    return _sheet_id
+
+
+def append_rows(rows: Sequence[Sequence[str]]):
+    """Append *rows* to the configured sheet in one ``values.append`` call.
+
+    Blocking; call it from a worker thread.  No-op if credentials/sheet id
+    are missing.  Raises exceptions from the Google API otherwise.
     """
-    if not _service or not _sheet_id:
+    if not is_configured() or not rows:
         return  # no-op in dev
 
-    body = {"values": [list(values)]}
-    _service.spreadsheets().values().append(
+    body = {"values": [list(values) for values in rows]}
+    client().spreadsheets().values().append(
         spreadsheetId=_sheet_id,
-        range="Sheet1!A:Z",
+        range=f"{SHEET_NAME}!A:Z",
         insertDataOption="INSERT_ROWS",
         valueInputOption="RAW",
         body=body,
     ).execute()
 
 
-def append_order(user_name: str, menu_item: str, details: str | None, location: str):
-    """Helper wrapper for the Order flow."""
-    timestamp = datetime.utcnow().isoformat()
-    append_row([timestamp, user_name, menu_item, details or "", location]) 
\ No newline at end of file
+def append_row(values: Sequence[str]):
+    """Append a single row to the configured sheet."""
+    append_rows([values])
+
+
+# One row per order, keyed by the order id in column A
+ORDER_COLUMNS = ("order_id", "created_at", "name", "menu_item", "details", "pickup_location", "time_slot", "status")
+
+
+def order_row(
+    order_id: int,
+    created_at: datetime,
+    user_name: str,
+    menu_item: str,
+    details: str | None,
+    location: str,
+    time_slot: str,
+    status: str,
+) -> list:
+    """The sheet row for one order.  Only stored fields, so it can be rebuilt."""
+    return [
+        str(order_id),
+        as_utc(created_at).replace(tzinfo=None).isoformat(timespec="seconds"),
+        user_name,
+        menu_item,
+        details or "",
+        location,
+        time_slot,
+        status,
+    ]
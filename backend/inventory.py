@@ -0,0 +1,49 @@
+"""Per-item stock for orders, claimed without locking or reading first.
+
+A stock-tracked menu item (``stock_remaining`` not NULL) is decremented by
+one conditional ``UPDATE ... WHERE stock_remaining > 0 RETURNING``.  The
+database applies concurrent decrements one after another on the row, so
+two orders can never take the same last unit.  The statement that takes
+the last unit also clears ``is_available`` so the item leaves the menu.
+
+The claim belongs to the order's transaction: if the order insert fails
+and rolls back, the unit goes back on the shelf.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import MenuItem
+
+
+async def claim_item(db: AsyncSession, item_id: int) -> Tuple[str, bool]:
+    """Take one unit of *item_id*; return ``(item name, sold out now)``."""
+    claimed = (
+        await db.execute(
+            update(MenuItem)
+            .where(MenuItem.id == item_id, MenuItem.is_available, MenuItem.stock_remaining > 0)
+            # SET expressions see the row as it was before this update
+            .values(stock_remaining=MenuItem.stock_remaining - 1, is_available=MenuItem.stock_remaining > 1)
+            .returning(MenuItem.name, MenuItem.stock_remaining)
+            .execution_options(synchronize_session=False)
+        )
+    ).first()
+    if claimed is not None:
+        return claimed.name, claimed.stock_remaining == 0
+
+    # Nothing claimed: either the item isn't stock-tracked, or it's gone
+    item = (
+        await db.execute(
+            select(MenuItem.name, MenuItem.is_available, MenuItem.stock_remaining).where(MenuItem.id == item_id)
+        )
+    ).first()
+    if item is not None and item.is_available and item.stock_remaining is None:
+        return item.name, False
+    if item is not None and item.stock_remaining == 0:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Sold out")
+    raise HTTPException(status_code=404, detail="Menu item not available")
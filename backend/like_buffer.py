@@ -0,0 +1,223 @@
+"""Optional write-behind mode for post likes.
+
+With ``LIKE_WRITE_BEHIND=1`` a post like toggle only reads: the viewer's
+current state and the post's stored count.  The new state goes into an
+in-memory buffer, and the request is answered at once.  A background task
+flushes the buffer as one bulk INSERT and one bulk DELETE on post_likes,
+then recounts the touched posts.  It runs every ``LIKE_FLUSH_INTERVAL_MS``,
+or sooner once ``LIKE_FLUSH_MAX_OPS`` toggles are waiting.  The lifespan
+hook flushes whatever is left on shutdown.
+
+State for a (post, user) pair is layered: the pending buffer, then the
+batch being flushed, then the database.  Toggles and like-status reads on
+this worker see their own writes immediately.  Stored counts, and other
+workers, catch up at the next flush.  Comment likes stay synchronous (``likes.toggle_comment_like``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Collection, Dict, Optional, Set, Tuple
+
+from sqlalchemy import delete, exists, func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal, insert_ignoring_duplicates
+from .feed_cache import feed_cache
+from .models import Post as PostModel, post_likes
+
+LOGGER = logging.getLogger(__name__)
+
+# (post_id, user_id)
+LikeKey = Tuple[int, int]
+
+
+@dataclass
+class _Pending:
+    persisted: bool  # state the database will hold once earlier batches land
+    desired: bool
+
+
+class LikeBuffer:
+    def __init__(self, enabled: bool = False, flush_interval: float = 0.25, max_pending: int = 500):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[LikeKey, _Pending] = {}
+        self._pending_delta: Dict[int, int] = defaultdict(int)
+        self._flushing: Dict[LikeKey, _Pending] = {}
+        self._flushing_delta: Dict[int, int] = {}
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._completed = 0
+        self.toggles = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+
+    # ── toggles ──────────────────────────────────────────────────────
+    def _buffered(self, key: LikeKey) -> Optional[bool]:
+        entry = self._pending.get(key) or self._flushing.get(key)
+        return None if entry is None else entry.desired
+
+    async def toggle(self, db: AsyncSession, user_id: int, post_id: int) -> Optional[Tuple[bool, int]]:
+        """Toggle in memory and return ``(liked, likes_count)``, or None if the post is gone."""
+        key = (post_id, user_id)
+        query = select(
+            PostModel.likes_count,
+            exists().where(post_likes.c.post_id == post_id, post_likes.c.user_id == user_id),
+        ).where(PostModel.id == post_id)
+        while True:
+            completed = self._completed
+            row = (await db.execute(query)).one_or_none()
+            if row is None:
+                return None
+            # A batch that committed during the read may have moved the row
+            # under us; the buffered layers already account for any other case.
+            if self._completed == completed or self._buffered(key) is not None:
+                break
+        stored_count, stored_liked = row
+
+        # No awaits from here on: the buffer update is atomic on the event loop
+        current = self._buffered(key)
+        if current is None:
+            current = bool(stored_liked)
+        liked = not current
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = _Pending(persisted=current, desired=liked)
+        else:
+            entry.desired = liked
+        self._pending_delta[post_id] += 1 if liked else -1
+        self.toggles += 1
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+        likes_count = stored_count + self._pending_delta[post_id] + self._flushing_delta.get(post_id, 0)
+        return liked, likes_count
+
+    def overlay(self, user_id: int, post_ids: Collection[int], liked_posts: Set[int]) -> None:
+        """Apply this worker's unflushed toggles by *user_id* to a set of liked post ids."""
+        for post_id in post_ids:
+            buffered = self._buffered((post_id, user_id))
+            if buffered is True:
+                liked_posts.add(post_id)
+            elif buffered is False:
+                liked_posts.discard(post_id)
+
+    # ── flushing ─────────────────────────────────────────────────────
+    async def flush(self) -> None:
+        """Write the pending toggles in one transaction."""
+        async with self._lock:
+            if not self._pending:
+                return
+            self._flushing, self._pending = self._pending, {}
+            self._flushing_delta, self._pending_delta = dict(self._pending_delta), defaultdict(int)
+            try:
+                touched = await self._write(self._flushing)
+            except BaseException:
+                self.failures += 1
+                self._restore()
+                raise
+            finally:
+                self._flushing, self._flushing_delta = {}, {}
+                self._completed += 1
+            self.flushes += 1
+        for post_id in touched:
+            feed_cache.post_changed(post_id)
+
+    def _restore(self) -> None:
+        # Toggles made during the failed flush assumed this batch had landed
+        for key, entry in self._flushing.items():
+            newer = self._pending.get(key)
+            if newer is None:
+                self._pending[key] = entry
+            else:
+                newer.persisted = entry.persisted
+        for post_id, delta in self._flushing_delta.items():
+            self._pending_delta[post_id] += delta
+
+    async def _write(self, batch: Dict[LikeKey, _Pending]) -> Set[int]:
+        changed = {key: entry.desired for key, entry in batch.items() if entry.desired != entry.persisted}
+        if not changed:
+            return set()
+        touched = {post_id for post_id, _ in changed}
+        async with AsyncSessionLocal() as db:
+            # Posts deleted since the toggle would fail the whole batch on the FK
+            existing = set((await db.scalars(select(PostModel.id).where(PostModel.id.in_(touched)))).all())
+            inserts = [
+                {"user_id": user_id, "post_id": post_id}
+                for (post_id, user_id), liked in changed.items()
+                if liked and post_id in existing
+            ]
+            deletes = [(user_id, post_id) for (post_id, user_id), liked in changed.items() if not liked]
+            if inserts:
+                await db.execute(insert_ignoring_duplicates(post_likes, db.bind.dialect.name), inserts)
+            if deletes:
+                await db.execute(
+                    delete(post_likes).where(tuple_(post_likes.c.user_id, post_likes.c.post_id).in_(deletes))
+                )
+            # Recount rather than add deltas: other workers flush the same posts
+            await db.execute(
+                update(PostModel)
+                .where(PostModel.id.in_(existing))
+                .values(
+                    likes_count=select(func.count())
+                    .where(post_likes.c.post_id == PostModel.id)
+                    .scalar_subquery(),
+                    version=PostModel.version + 1,
+                )
+            )
+            await db.commit()
+        self.rows_written += len(inserts) + len(deletes)
+        return existing
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                LOGGER.exception("Like buffer flush failed; %d toggles kept for retry", len(self._pending))
+
+    # ── lifecycle ────────────────────────────────────────────────────
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything still buffered."""
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "toggles": self.toggles,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+        }
+
+
+like_buffer = LikeBuffer(
+    enabled=os.getenv("LIKE_WRITE_BEHIND", "0") == "1",
+    flush_interval=int(os.getenv("LIKE_FLUSH_INTERVAL_MS", "250")) / 1000,
+    max_pending=int(os.getenv("LIKE_FLUSH_MAX_OPS", "500")),
+)
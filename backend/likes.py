@@ -0,0 +1,69 @@
+"""Atomic like/unlike toggles for posts and comments.
+
+A toggle never loads the likers.  It deletes the viewer's row from the
+association table and, if there was none, inserts it with the dialect's
+``ON CONFLICT DO NOTHING``.  The counter then moves by however many rows
+actually changed, in an ``UPDATE ... RETURNING`` that hands back the new
+count.  Every statement touches a constant number of rows, and concurrent
+toggles on a hot post never lose an update.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from sqlalchemy import Table, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import insert_ignoring_duplicates
+from .models import Comment as CommentModel, Post as PostModel, comment_likes, post_likes
+
+
+async def _toggle_row(
+    db: AsyncSession, table: Table, target_column: str, user_id: int, target_id: int
+) -> Tuple[bool, int]:
+    """Flip the (user, target) row; return ``(liked, change in row count)``."""
+    deleted = await db.execute(
+        delete(table).where(table.c.user_id == user_id, table.c[target_column] == target_id)
+    )
+    if deleted.rowcount:
+        return False, -1
+    inserted = await db.execute(
+        insert_ignoring_duplicates(table, db.bind.dialect.name).values(
+            {"user_id": user_id, target_column: target_id}
+        )
+    )
+    # rowcount 0: a concurrent request from the same user inserted it first
+    return True, inserted.rowcount
+
+
+async def toggle_post_like(db: AsyncSession, user_id: int, post_id: int) -> Optional[Tuple[bool, int]]:
+    """Toggle the like and return ``(liked, likes_count)``, or None if the post is gone."""
+    if await db.scalar(select(PostModel.id).where(PostModel.id == post_id)) is None:
+        return None
+    liked, delta = await _toggle_row(db, post_likes, "post_id", user_id, post_id)
+    likes_count = await db.scalar(
+        update(PostModel)
+        .where(PostModel.id == post_id)
+        .values(likes_count=PostModel.likes_count + delta, version=PostModel.version + 1)
+        .returning(PostModel.likes_count)
+    )
+    return liked, likes_count
+
+
+async def toggle_comment_like(
+    db: AsyncSession, user_id: int, comment_id: int
+) -> Optional[Tuple[bool, int, int]]:
+    """Toggle the like and return ``(liked, likes_count, post_id)``, or None if the comment is gone."""
+    if await db.scalar(select(CommentModel.id).where(CommentModel.id == comment_id)) is None:
+        return None
+    liked, delta = await _toggle_row(db, comment_likes, "comment_id", user_id, comment_id)
+    likes_count, post_id = (
+        await db.execute(
+            update(CommentModel)
+            .where(CommentModel.id == comment_id)
+            .values(likes_count=CommentModel.likes_count + delta)
+            .returning(CommentModel.likes_count, CommentModel.post_id)
+        )
+    ).one()
+    return liked, likes_count, post_id
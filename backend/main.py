@@ -5,14 +5,32 @@ FastAPI entry-point
 
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager   # ← new
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import logging
 import os
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
 
+from backend.backfill_orders import backfill_order_refs
+from backend.bootstrap import bootstrap
 from backend.database import engine, Base
-from backend.auth import router as auth_router
+from backend import google_sheets
+from backend.feed_cache import feed_cache
+from backend.like_buffer import like_buffer
+from backend.serialization import post_bytes
+from backend.passwords import password_hasher
+from backend import ratelimit
+from backend.outbox import outbox_dispatcher
+from backend.singleflight import reads
+from backend.user_cache import user_cache
+from backend.reference_data import reference_data
+from backend.repair_counters import recompute_counters
+from backend.auth import purge_refresh_tokens, router as auth_router
 from backend.routes import menu
 from backend.routes import social_feed
 
@@ -20,22 +38,96 @@ from backend.routes import social_feed
 
 load_dotenv()  # picks up DATABASE_URL, SECRET_KEY, etc.
 
+LOGGER = logging.getLogger(__name__)
+
 
 # ────────────────── DB init on startup ──────────────────────────
+# Columns added to existing tables after the first deploy: table -> {column: DDL}
+ADDED_COLUMNS = {
+    "orders": {
+        "details": "TEXT",
+        "pickup_location_id": "INTEGER REFERENCES pickup_locations(id)",
+        "time_slot_id": "INTEGER REFERENCES time_slots(id)",
+    },
+    "posts": {
+        "likes_count": "INTEGER NOT NULL DEFAULT 0",
+        "comments_count": "INTEGER NOT NULL DEFAULT 0",
+        "version": "INTEGER NOT NULL DEFAULT 1",
+    },
+    "comments": {"likes_count": "INTEGER NOT NULL DEFAULT 0"},
+    "menu_items": {"stock_remaining": "INTEGER"},
+}
+
+
+def _missing_columns(sync_conn) -> dict[str, list[str]]:
+    inspector = inspect(sync_conn)
+    missing = {}
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {col["name"] for col in inspector.get_columns(table)}
+        missing[table] = [name for name in columns if name not in existing]
+    return missing
+
+
+async def _create_missing_indexes():
+    # create_all() skips tables that already exist, so indexes declared
+    # after the first deploy have to be created one by one.
+    # IF NOT EXISTS rather than checkfirst: reflection can't see expression
+    # indexes such as lower(email) on SQLite.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            # One transaction each: a unique index that existing rows already
+            # violate is skipped (and logged) without aborting the others
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(CreateIndex(index, if_not_exists=True))
+            except IntegrityError as exc:
+                LOGGER.warning("Skipping index %s; existing rows violate it: %s", index.name, exc.orig)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
         # ── Lightweight migration for newly-added columns ──────────────────
-        from sqlalchemy import text
-
-# ── Create 'details' column on SQLite if it isn't there already ──
-        result = await conn.execute(text("PRAGMA table_info(orders)"))
-        cols = [row[1] for row in result]
-        if "details" not in cols:
-            await conn.execute(text("ALTER TABLE orders ADD COLUMN details TEXT"))
-    yield
+        missing = await conn.run_sync(_missing_columns)
+        for table, columns in missing.items():
+            for column in columns:
+                ddl = ADDED_COLUMNS[table][column]
+                await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+        # Freshly added counters start at zero; fill them from the like/comment tables
+        if missing["posts"] or missing["comments"]:
+            await recompute_counters(conn)
+
+    await _create_missing_indexes()
+
+    async with engine.begin() as conn:
+        await bootstrap(conn)
+        await backfill_order_refs(conn)
+        # Sign-ins purge their own user's dead tokens; this catches users who left
+        await purge_refresh_tokens(conn)
+
+    await reference_data.start()
+    like_buffer.start()
+    outbox_dispatcher.start()
+    # Off the startup path: the app answers health checks while the client builds
+    sheets_warmup = asyncio.create_task(asyncio.to_thread(google_sheets.warm_up))
+    try:
+        yield
+    finally:
+        await reference_data.stop()
+        await outbox_dispatcher.stop()
+        # Buffered like toggles were already acknowledged; don't drop them
+        await like_buffer.stop()
+        password_hasher.shutdown()
+        # Last, so a hung credential or discovery call can't hold up the flushes
+        # above; the thread itself can't be interrupted and is left to finish
+        sheets_warmup.cancel()
+        try:
+            await sheets_warmup
+        except asyncio.CancelledError:
+            pass
 # ────────────────────────────────────────────────────────────────
 
 app = FastAPI(
@@ -54,6 +146,21 @@ async def root_head():
     # instance is marked healthy and requests are routed to it.
     return {"status": "ok"}
 
+# In-process counters for this worker (cache hit rates etc.)
+@app.get("/api/metrics", include_in_schema=False)
+async def metrics():
+    return {
+        "feed_cache": feed_cache.stats(),
+        "single_flight": reads.stats(),
+        "post_bytes": post_bytes.stats(),
+        "like_buffer": like_buffer.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "rate_limits": ratelimit.stats(),
+        "reference_data": reference_data.stats(),
+        "outbox": outbox_dispatcher.stats(),
+    }
+
 # Configure CORS origins ------------------------------------------------------
 # By default allow localhost for dev. You can supply a comma-separated list of
 # origins in the CORS_ALLOW_ORIGINS env variable for production.
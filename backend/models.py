@@ -5,6 +5,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
@@ -74,6 +75,12 @@ class User(Base):
         cascade="all, delete-orphan",
     )
 
+    # Login looks users up by lower(email): stays index-only even for rows
+    # stored before emails were normalised on signup
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
     # Computed properties to satisfy API schema ---------------------
     @property
     def pickup_location(self) -> str | None:
@@ -97,6 +104,13 @@ class Post(Base):
     content = Column(Text, nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     location_filter = Column(String, nullable=True)  # For location-specific posts
+    # Denormalised counters, kept in step by the like/comment write paths
+    # (see repair_counters.py to recompute them)
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped whenever anything rendered with the post changes (edits,
+    # comments, likes); keys the serialised-response cache and ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -105,13 +119,10 @@ class Post(Base):
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     liked_by = relationship("User", secondary=post_likes, back_populates="liked_posts")
 
-    @property
-    def likes_count(self):
-        return len(self.liked_by)
-
-    @property
-    def comments_count(self):
-        return len(self.comments)
+    # Keyset pagination for the feed: filter on location, walk (created_at, id)
+    __table_args__ = (
+        Index("ix_posts_location_created_id", "location_filter", "created_at", "id"),
+    )
 
 
 class Comment(Base):
@@ -122,6 +133,7 @@ class Comment(Base):
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
     parent_id = Column(Integer, ForeignKey("comments.id"), nullable=True)  # For nested comments
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -132,9 +144,27 @@ class Comment(Base):
     replies = relationship("Comment", back_populates="parent", cascade="all, delete-orphan")
     liked_by = relationship("User", secondary=comment_likes, back_populates="liked_comments")
 
-    @property
-    def likes_count(self):
-        return len(self.liked_by)
+    # Thread pages: a post's top-level comments, and a comment's replies,
+    # both walked in (created_at, id) order
+    __table_args__ = (
+        Index("ix_comments_post_parent_created_id", "post_id", "parent_id", "created_at", "id"),
+        Index("ix_comments_parent_created_id", "parent_id", "created_at", "id"),
+    )
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # SHA-256 of the opaque token; the token itself is never stored
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    # Every token rotated from the same login shares a family, so reuse of
+    # an already-rotated token can revoke the whole chain
+    family = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class PickupLocation(Base):
@@ -153,6 +183,27 @@ class TimeSlot(Base):
     time = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Conflict target for the startup bootstrap's ON CONFLICT DO NOTHING
+    __table_args__ = (Index("uq_time_slots_time", time, unique=True),)
+
+
+class SlotCapacity(Base):
+    """How many orders one pickup location can hand out in one time slot.
+
+    A (location, slot) pair without a row is unlimited and untracked.
+    """
+    __tablename__ = "slot_capacities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pickup_location_id = Column(Integer, ForeignKey("pickup_locations.id", ondelete="CASCADE"), nullable=False)
+    time_slot_id = Column(Integer, ForeignKey("time_slots.id", ondelete="CASCADE"), nullable=False)
+    capacity = Column(Integer, nullable=False)
+    booked = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("uq_slot_capacities_location_slot", pickup_location_id, time_slot_id, unique=True),
+    )
+
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
@@ -162,9 +213,43 @@ class MenuItem(Base):
     description = Column(Text, nullable=True)
     price = Column(String, nullable=False)
     is_available = Column(Boolean, default=True)
+    # Units left to sell; NULL means the item isn't stock-tracked
+    stock_remaining = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (Index("uq_menu_items_name", name, unique=True),)
+
+
+class ReferenceDataVersion(Base):
+    """Single row bumped by every admin change to menu items, pickup
+    locations or time slots; workers reload their snapshot when it moves."""
+    __tablename__ = "reference_data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class OutboxEvent(Base):
+    """A side effect of a committed change (e.g. the Sheets row for an order),
+    written in the same transaction and delivered later by the outbox
+    dispatcher.  Deleted once delivered."""
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime(timezone=True), nullable=False)  # not retried before this
+    # A dispatcher owns the row until leased_until; an expired lease is up for grabs
+    lease_owner = Column(String(64), nullable=True)
+    leased_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_outbox_available_at", available_at),)
+
 
 class Order(Base):
     __tablename__ = "orders"
@@ -172,13 +257,21 @@ class Order(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False)
+    # Names as the customer picked them; queries go through the ids below
     pickup_location = Column(String, nullable=False)
     time_slot = Column(String, nullable=False)
+    # NULL when the name matched no pickup location / time slot
+    pickup_location_id = Column(Integer, ForeignKey("pickup_locations.id"), nullable=True)
+    time_slot_id = Column(Integer, ForeignKey("time_slots.id"), nullable=True)
     details = Column(Text, nullable=True)
     status = Column(String, default="pending")  # pending, confirmed, completed, cancelled
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_orders_location_slot_status", pickup_location_id, time_slot_id, status),
+    )
+
     # Relationships
     user = relationship("User", back_populates="orders")
     menu_item = relationship("MenuItem")
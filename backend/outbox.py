@@ -0,0 +1,254 @@
+"""Transactional outbox for side effects of orders.
+
+A handler that needs something done outside the database, such as
+appending the order's row to the Google Sheet, calls ``publish`` before it
+commits.  That adds an ``outbox`` row in the same transaction, so the side
+effect is recorded if and only if the order is.  No external call happens
+on the request path.
+
+Every worker runs a dispatcher.  It claims up to ``OUTBOX_BATCH_SIZE`` due
+rows by stamping them with its name and a lease of ``OUTBOX_LEASE_SECONDS``,
+in one ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)``.  On
+Postgres, concurrent dispatchers skip each other's rows instead of waiting.
+SQLite has no row locks and runs writes one at a time, so the lease alone
+keeps the claims apart.  Claimed rows are handed to their topic's sink in
+one call per topic:
+- Rows delivered successfully are deleted.
+- Rows that fail get exponential backoff (capped at
+  ``OUTBOX_MAX_BACKOFF_SECONDS``) and their lease is released.
+- Rows held by a crashed dispatcher become claimable again when the
+  lease runs out.
+
+Delivery is at-least-once: a sink may see a row again after a timeout or
+an expired lease.  The dispatcher polls every ``OUTBOX_POLL_INTERVAL_MS``
+and wakes right away when this worker publishes.  On shutdown it keeps
+delivering for up to ``OUTBOX_SHUTDOWN_TIMEOUT_SECONDS``.  Whatever is left
+waits in the table for the next start.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import google_sheets
+from .database import AsyncSessionLocal
+from .models import OutboxEvent
+from .timeutil import as_utc
+
+LOGGER = logging.getLogger(__name__)
+
+SHEETS_ORDER_ROW = "sheets.order_row"
+
+
+@dataclass(frozen=True)
+class Sink:
+    deliver: Callable[[List[dict]], Awaitable[None]]  # raises to have the whole batch retried
+    enabled: Callable[[], bool] = lambda: True
+
+
+async def _append_to_sheet(payloads: List[dict]) -> None:
+    # Blocking httplib2 call; one values.append for the whole batch
+    await asyncio.to_thread(google_sheets.append_rows, [payload["row"] for payload in payloads])
+
+
+# topic -> sink
+SINKS: Dict[str, Sink] = {
+    SHEETS_ORDER_ROW: Sink(_append_to_sheet, google_sheets.is_configured),
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def publish(db: AsyncSession, topic: str, payload: dict) -> None:
+    """Record *payload* for *topic*'s sink; lands only if *db* commits."""
+    if not SINKS[topic].enabled():
+        return
+    now = _now()
+    db.add(OutboxEvent(topic=topic, payload=json.dumps(payload), available_at=now, created_at=now))
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        batch_size: int = 200,
+        poll_interval: float = 1.0,
+        lease: float = 60.0,
+        max_backoff: float = 300.0,
+        shutdown_timeout: float = 10.0,
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_backoff = max_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[:64]
+        self._wake = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.claimed = 0
+        self.delivered = 0
+        self.failures = 0
+        self.pending = 0
+        self.lag_s = 0.0
+
+    def notify(self) -> None:
+        """Something was just published; dispatch without waiting for the poll."""
+        self._wake.set()
+
+    async def _claim(self, db: AsyncSession) -> List[OutboxEvent]:
+        now = _now()
+        due = (
+            select(OutboxEvent.id)
+            .where(
+                OutboxEvent.available_at <= now,
+                or_(OutboxEvent.leased_until.is_(None), OutboxEvent.leased_until < now),
+            )
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)  # rendered on Postgres only
+        )
+        rows = (
+            await db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(due))
+                .values(lease_owner=self.owner, leased_until=now + timedelta(seconds=self.lease))
+                .returning(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.payload, OutboxEvent.attempts)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+        await db.commit()
+        self.claimed += len(rows)
+        return sorted(rows, key=lambda row: row.id)
+
+    def _retry_at(self, attempts: int) -> datetime:
+        delay = min(self.max_backoff, 2.0 ** attempts) * random.uniform(0.5, 1.0)
+        return _now() + timedelta(seconds=delay)
+
+    async def _settle(self, db: AsyncSession, delivered: List[int], failed: List[tuple]) -> None:
+        if delivered:
+            await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(delivered)))
+        if failed:
+            table = OutboxEvent.__table__
+            # Only rows still leased to us: an expired lease may have been re-claimed
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("event_id"), table.c.lease_owner == self.owner)
+                .values(
+                    attempts=bindparam("new_attempts"),
+                    available_at=bindparam("retry_at"),
+                    last_error=bindparam("error"),
+                    lease_owner=None,
+                    leased_until=None,
+                ),
+                [
+                    {"event_id": row.id, "new_attempts": row.attempts + 1,
+                     "retry_at": self._retry_at(row.attempts), "error": error[:1000]}
+                    for row, error in failed
+                ],
+            )
+        await db.commit()
+
+    async def dispatch_once(self) -> int:
+        """Claim one batch and deliver it; return how many rows were claimed."""
+        async with AsyncSessionLocal() as db:
+            rows = await self._claim(db)
+            if not rows:
+                return 0
+            by_topic = defaultdict(list)
+            for row in rows:
+                by_topic[row.topic].append(row)
+            delivered: List[int] = []
+            failed: List[tuple] = []
+            for topic, batch in by_topic.items():
+                sink = SINKS.get(topic)
+                try:
+                    if sink is None:
+                        raise LookupError(f"no sink for topic {topic!r}")
+                    await asyncio.wait_for(
+                        sink.deliver([json.loads(row.payload) for row in batch]), timeout=self.lease
+                    )
+                except Exception as exc:
+                    self.failures += 1
+                    LOGGER.warning("Outbox delivery to %s failed for %d rows: %r", topic, len(batch), exc)
+                    failed.extend((row, repr(exc)) for row in batch)
+                else:
+                    delivered.extend(row.id for row in batch)
+            await self._settle(db, delivered, failed)
+            self.delivered += len(delivered)
+            return len(rows)
+
+    async def _sample(self) -> None:
+        async with AsyncSessionLocal() as db:
+            count, oldest = (await db.execute(select(func.count(), func.min(OutboxEvent.created_at)))).one()
+        self.pending = count
+        self.lag_s = round((_now() - as_utc(oldest)).total_seconds(), 3) if oldest is not None else 0.0
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                # Keep going while full batches come back
+                while await self.dispatch_once() >= self.batch_size and not self._stopped.is_set():
+                    pass
+                await self._sample()
+            except Exception:
+                LOGGER.exception("Outbox dispatch failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _drain(self) -> None:
+        while await self.dispatch_once():
+            pass
+
+    # ── lifecycle ────────────────────────────────────────────────────
+    def start(self) -> None:
+        if self._task is None:
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling and deliver what is due, within the shutdown timeout."""
+        if self._task is not None:
+            self._stopped.set()
+            self._wake.set()
+            await self._task
+            self._task = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout=self.shutdown_timeout)
+        except Exception as exc:
+            LOGGER.warning("Outbox not fully drained on shutdown (%r); rows stay queued for the next start", exc)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "lag_s": self.lag_s,
+            "claimed": self.claimed,
+            "delivered": self.delivered,
+            "failures": self.failures,
+        }
+
+
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "200")),
+    poll_interval=int(os.getenv("OUTBOX_POLL_INTERVAL_MS", "1000")) / 1000,
+    lease=float(os.getenv("OUTBOX_LEASE_SECONDS", "60")),
+    max_backoff=float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "300")),
+    shutdown_timeout=float(os.getenv("OUTBOX_SHUTDOWN_TIMEOUT_SECONDS", "10")),
+)
@@ -0,0 +1,70 @@
+"""Opaque keyset cursors for the feed endpoints.
+
+A cursor pins the last row of a page by its ``(created_at, id)`` sort key so
+the next page can be fetched with an index range scan instead of an OFFSET
+that walks every earlier row.  Clients treat the value as an opaque string.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import String, and_, or_, type_coerce
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["t"]), int(data["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("Malformed pagination cursor") from exc
+
+
+def _sqlite_timestamp(value: datetime) -> str:
+    # SQLite keeps DateTime columns as text.  Rows written through
+    # ``server_default=func.now()`` have no fractional part while SQLAlchemy
+    # binds parameters with microseconds, so compare against the exact text
+    # the row would have been stored with.
+    fmt = "%Y-%m-%d %H:%M:%S" if value.microsecond == 0 else "%Y-%m-%d %H:%M:%S.%f"
+    return value.replace(tzinfo=None).strftime(fmt)
+
+
+def _comparable(created_col, cursor: Tuple[datetime, int], dialect_name: str):
+    created_at, row_id = cursor
+    if dialect_name == "sqlite":
+        created_col = type_coerce(created_col, String)
+        created_at = _sqlite_timestamp(created_at)
+    return created_col, created_at, row_id
+
+
+def before_cursor(created_col, id_col, cursor: Tuple[datetime, int], dialect_name: str) -> ColumnElement:
+    """WHERE clause selecting rows that sort after *cursor* in DESC order."""
+    created_col, created_at, row_id = _comparable(created_col, cursor, dialect_name)
+    return or_(
+        created_col < created_at,
+        and_(created_col == created_at, id_col < row_id),
+    )
+
+
+def after_cursor(created_col, id_col, cursor: Tuple[datetime, int], dialect_name: str) -> ColumnElement:
+    """WHERE clause selecting rows that sort after *cursor* in ASC order."""
+    created_col, created_at, row_id = _comparable(created_col, cursor, dialect_name)
+    return or_(
+        created_col > created_at,
+        and_(created_col == created_at, id_col > row_id),
+    )
+
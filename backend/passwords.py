@@ -0,0 +1,77 @@
+"""Password hashing off the event loop.
+
+A bcrypt hash or verify takes a couple of hundred milliseconds of CPU.  Run
+inline in an async handler it stalls every other request on the worker,
+feed polls and WebSockets included.  Calls are instead handed to a small
+thread pool (bcrypt releases the GIL while it works) of
+``PASSWORD_HASH_WORKERS`` threads.
+
+Admission is bounded: at most ``PASSWORD_HASH_MAX_QUEUE`` calls may wait
+for a thread.  Beyond that the request fails fast with 503 and Retry-After
+instead of piling up behind a sign-up burst.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+T = TypeVar("T")
+
+pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._admitted = 0  # waiting for a thread + running on one
+        self.completed = 0
+        self.rejected = 0
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._admitted >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self._admitted += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._admitted -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_ctx.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(pwd_ctx.verify, password, hashed)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        running = min(self._admitted, self.workers)
+        return {
+            "workers": self.workers,
+            "running": running,
+            "queue_depth": self._admitted - running,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64")),
+)
@@ -0,0 +1,107 @@
+"""In-process token-bucket throttling for the password endpoints.
+
+Every login and registration costs a bcrypt round, so each client IP and
+each email address gets a bucket of ``limit`` attempts that refills
+continuously over ``window`` seconds.  A bucket is two floats; buckets
+that have sat long enough to be full again are swept out every
+``window`` seconds.  Over-limit requests get 429 with a Retry-After telling
+the client exactly when the next attempt will be accepted.
+
+Limits are per worker process, so the effective ceiling scales with the
+number of workers.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+# Off by default: a client that reaches uvicorn directly can put anything in
+# X-Forwarded-For and get a fresh bucket per request.  Set it to "1" only
+# behind a proxy (such as Render's) that appends the client address; the
+# client is then the last hop.
+TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "0") == "1"
+
+
+class RateLimiter:
+    def __init__(self, name: str, limit: int, window: float):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.rate = limit / window  # tokens per second
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+        self._next_sweep = time.monotonic() + window
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str) -> Optional[float]:
+        """Take one token for *key*; return None if allowed, else seconds to wait."""
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        tokens, updated_at = self._buckets.get(key, (self.limit, now))
+        tokens = min(self.limit, tokens + (now - updated_at) * self.rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            self.allowed += 1
+            return None
+        self._buckets[key] = (tokens, now)
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def _sweep(self, now: float) -> None:
+        # A bucket untouched for a full window has refilled; forgetting it is equivalent
+        cutoff = now - self.window
+        for key in [k for k, (_, updated_at) in self._buckets.items() if updated_at <= cutoff]:
+            del self._buckets[key]
+        self._next_sweep = now + self.window
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "window_s": self.window,
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce(checks: List[Tuple[RateLimiter, str]]) -> None:
+    """Raise 429 at the first ``(limiter, key)`` pair that is over its limit."""
+    for limiter, key in checks:
+        wait = limiter.acquire(key)
+        if wait is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please wait before trying again",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+
+def _limiter(name: str, env: str, default: int, window: float = 60.0) -> RateLimiter:
+    return RateLimiter(name, int(os.getenv(env, str(default))), window)
+
+
+# Generous per IP: a whole venue may share one Wi-Fi address
+login_by_ip = _limiter("login_ip", "LOGIN_RATE_PER_IP_PER_MINUTE", 60)
+login_by_email = _limiter("login_email", "LOGIN_RATE_PER_EMAIL_PER_MINUTE", 10)
+register_by_ip = _limiter("register_ip", "REGISTER_RATE_PER_IP_PER_MINUTE", 30)
+register_by_email = _limiter("register_email", "REGISTER_RATE_PER_EMAIL_PER_MINUTE", 5)
+
+LIMITERS = (login_by_ip, login_by_email, register_by_ip, register_by_email)
+
+
+def stats() -> dict:
+    return {limiter.name: limiter.stats() for limiter in LIMITERS}
@@ -0,0 +1,204 @@
+"""Bring the orders sheet back in line with the orders table.
+
+Use this after a Sheets outage, or whenever the sheet has drifted.  It
+reads the sheet with one ``values.get``, keys each row on the order id in
+column A, and compares a hash of the row with the row the orders table
+produces.  Only what differs is written, in a few ``values.batchUpdate``
+calls:
+- changed rows are overwritten in place;
+- missing orders are added after the last row;
+- extra copies of a row (left behind by at-least-once delivery) are
+  blanked.
+
+Rows without a known order id are left alone, such as the header and
+notes.  Sheets written before rows were keyed on the order id used the
+layout ``timestamp, name, menu_item, details, pickup_location``; those
+legacy rows now sit under the wrong headings.  The job can't tie them to
+an order, so it counts them separately and leaves them for the organiser
+to move or delete.  Their orders are appended again in the new layout.
+
+Orders placed while the job runs may be appended by the outbox into rows
+the job is writing.  Running it again repairs that.
+
+    python -m backend.reconcile_sheet [--dry-run] [--fake]
+
+``--fake`` runs against an empty in-memory sheet (``backend.sheets_fake``)
+instead of the configured one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .google_sheets import ORDER_COLUMNS, SHEET_NAME, order_row
+from .models import MenuItem, Order, User
+
+WIDTH = len(ORDER_COLUMNS)
+LAST_COLUMN = chr(ord("A") + WIDTH - 1)
+
+
+def row_hash(values: Sequence) -> str:
+    # Sheets trims trailing empty cells, so pad before hashing
+    cells = [str(value) for value in values][:WIDTH]
+    cells += [""] * (WIDTH - len(cells))
+    return hashlib.sha1("\x1f".join(cells).encode()).hexdigest()
+
+
+@dataclass
+class Plan:
+    first_free_row: int  # 1-based sheet row that appends start at
+    updates: Dict[int, list] = field(default_factory=dict)  # sheet row -> values
+    appends: List[list] = field(default_factory=list)
+    unchanged: int = 0
+    duplicates: int = 0
+    unknown: int = 0
+    legacy: int = 0  # timestamp-first rows from before the order id column
+    calls: int = 0
+
+    def value_ranges(self) -> List[dict]:
+        """One ValueRange per run of consecutive rows to write."""
+        writes = dict(self.updates)
+        for offset, values in enumerate(self.appends):
+            writes[self.first_free_row + offset] = values
+        ranges: List[dict] = []
+        start = previous = None
+        block: List[list] = []
+        for number in sorted(writes):
+            if previous is not None and number != previous + 1:
+                ranges.append(_value_range(start, previous, block))
+                block = []
+            if not block:
+                start = number
+            block.append(writes[number])
+            previous = number
+        if block:
+            ranges.append(_value_range(start, previous, block))
+        return ranges
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.updates) - self.duplicates} changed, {len(self.appends)} appended, "
+            f"{self.duplicates} duplicates blanked, {self.unchanged} unchanged, "
+            f"{self.unknown} rows left alone, {self.legacy} legacy rows left alone; "
+            f"{self.calls} batchUpdate calls"
+        )
+
+
+def _value_range(start: int, end: int, rows: List[list]) -> dict:
+    padded = [list(row) + [""] * (WIDTH - len(row)) for row in rows]
+    return {"range": f"{SHEET_NAME}!A{start}:{LAST_COLUMN}{end}", "values": padded}
+
+
+def _is_legacy(key: str) -> bool:
+    # The old layout started with datetime.utcnow().isoformat()
+    try:
+        datetime.fromisoformat(key)
+    except ValueError:
+        return False
+    return "T" in key
+
+
+def diff(sheet_rows: List[list], orders: Dict[int, list]) -> Plan:
+    """Work out the writes that turn *sheet_rows* into the rows of *orders*."""
+    plan = Plan(first_free_row=len(sheet_rows) + 1)
+    seen = set()
+    for number, row in enumerate(sheet_rows, start=1):
+        key = str(row[0]).strip() if row else ""
+        expected = orders.get(int(key)) if key.isdigit() else None
+        if expected is None:
+            if _is_legacy(key):
+                plan.legacy += 1
+            elif any(str(cell).strip() for cell in row):
+                plan.unknown += 1
+        elif int(key) in seen:
+            plan.updates[number] = [""] * WIDTH
+            plan.duplicates += 1
+        else:
+            seen.add(int(key))
+            if row_hash(row) == row_hash(expected):
+                plan.unchanged += 1
+            else:
+                plan.updates[number] = expected
+    if not sheet_rows:
+        plan.appends.append(list(ORDER_COLUMNS))
+    plan.appends.extend(orders[order_id] for order_id in sorted(orders) if order_id not in seen)
+    return plan
+
+
+async def load_order_rows(db: AsyncSession) -> Dict[int, list]:
+    result = await db.execute(
+        select(
+            Order.id, Order.created_at, User.name, MenuItem.name, Order.details,
+            Order.pickup_location, Order.time_slot, Order.status,
+        )
+        .join(User, User.id == Order.user_id)
+        .join(MenuItem, MenuItem.id == Order.menu_item_id)
+        .order_by(Order.id)
+    )
+    return {
+        order_id: order_row(order_id, created_at, user_name, item, details, location, slot, status or "")
+        for order_id, created_at, user_name, item, details, location, slot, status in result
+    }
+
+
+def read_sheet(values, spreadsheet_id: str) -> List[list]:
+    response = values.get(spreadsheetId=spreadsheet_id, range=f"{SHEET_NAME}!A:{LAST_COLUMN}").execute()
+    return response.get("values", [])
+
+
+def apply(values, spreadsheet_id: str, plan: Plan, ranges_per_call: int = 500) -> int:
+    """Send the plan's writes; return the number of batchUpdate calls made."""
+    ranges = plan.value_ranges()
+    for start in range(0, len(ranges), ranges_per_call):
+        values.batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"valueInputOption": "RAW", "data": ranges[start:start + ranges_per_call]},
+        ).execute()
+        plan.calls += 1
+    return plan.calls
+
+
+async def reconcile(db: AsyncSession, values, spreadsheet_id: str, dry_run: bool = False) -> Plan:
+    """Diff the sheet against the orders table and, unless *dry_run*, write the difference.
+
+    *values* is a ``spreadsheets().values()`` resource (or a ``FakeValues``).
+    """
+    # Sheet first: orders committed meanwhile are then added rather than missed
+    sheet_rows = await asyncio.to_thread(read_sheet, values, spreadsheet_id)
+    plan = diff(sheet_rows, await load_order_rows(db))
+    if not dry_run:
+        await asyncio.to_thread(apply, values, spreadsheet_id, plan)
+    return plan
+
+
+async def main(dry_run: bool, fake: bool) -> None:
+    from . import google_sheets
+    from .database import AsyncSessionLocal, engine
+    from .sheets_fake import FakeValues
+
+    if fake:
+        values, spreadsheet_id = FakeValues(), "fake"
+    else:
+        values, spreadsheet_id = google_sheets.values_resource(), google_sheets.sheet_id()
+        if values is None:
+            raise SystemExit("Google Sheets is not configured; use --fake to try the job locally")
+    async with AsyncSessionLocal() as db:
+        plan = await reconcile(db, values, spreadsheet_id, dry_run=dry_run)
+    await engine.dispose()
+    print(("Would write: " if dry_run else "Reconciled: ") + plan.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report the difference without writing")
+    parser.add_argument("--fake", action="store_true", help="use an in-memory sheet instead of Google Sheets")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.fake))
@@ -0,0 +1,174 @@
+"""In-process snapshot of the onboarding reference data.
+
+Today's menu, pickup locations and time slots are read on every onboarding
+page load but change a couple of times per event.  Each worker loads them
+once at startup and serves pre-serialised bodies (with ETag and a short
+``Cache-Control: max-age``) without touching the database.
+
+Admin changes bump the single ``reference_data_version`` row in the same
+transaction and reload the local snapshot right away.  Other workers notice
+the new version on their next poll, every ``REFERENCE_DATA_POLL_SECONDS``.
+
+The snapshot also maps pickup location and time slot names to ids, so
+orders, which arrive with names, are stored and filtered by id without a
+lookup query.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal, insert_ignoring_duplicates
+from .models import (
+    MenuItem as MenuItemModel,
+    PickupLocation as PickupLocationModel,
+    ReferenceDataVersion,
+    TimeSlot as TimeSlotModel,
+)
+from .schemas.menu import MenuItem, PickupLocation, TimeSlot
+from .serialization import JSON_OPTIONS, json_response
+
+LOGGER = logging.getLogger(__name__)
+
+_VERSION_ROW = 1
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    bodies: Dict[str, bytes]  # "menu" | "pickup_locations" | "time_slots"
+    location_ids: Dict[str, int]  # pickup location name -> id
+    slot_ids: Dict[str, int]  # time slot label -> id
+
+
+async def _stored_version(db: AsyncSession) -> int:
+    version = await db.scalar(select(ReferenceDataVersion.version).where(ReferenceDataVersion.id == _VERSION_ROW))
+    if version is None:
+        # Every worker races to create the row on first start; one wins
+        await db.execute(
+            insert_ignoring_duplicates(ReferenceDataVersion.__table__, db.bind.dialect.name)
+            .values(id=_VERSION_ROW, version=1)
+        )
+        await db.commit()
+        version = await db.scalar(select(ReferenceDataVersion.version).where(ReferenceDataVersion.id == _VERSION_ROW))
+    return version
+
+
+def _body(schema, rows) -> bytes:
+    return orjson.dumps(
+        [schema.model_validate(row, from_attributes=True).model_dump() for row in rows],
+        option=JSON_OPTIONS,
+    )
+
+
+class ReferenceData:
+    def __init__(self, poll_interval: float, max_age: int):
+        self.poll_interval = poll_interval
+        self.cache_control = f"public, max-age={max_age}"
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.reloads = 0
+        self.lookup_misses = 0
+
+    async def reload(self, db: AsyncSession) -> Snapshot:
+        """Rebuild the snapshot from the database."""
+        async with self._lock:
+            version = await _stored_version(db)
+            menu = await db.scalars(select(MenuItemModel).where(MenuItemModel.is_available).order_by(MenuItemModel.id))
+            locations = (await db.scalars(select(PickupLocationModel).order_by(PickupLocationModel.id))).all()
+            slots = (await db.scalars(select(TimeSlotModel).order_by(TimeSlotModel.id))).all()
+            self._snapshot = Snapshot(
+                version=version,
+                bodies={
+                    "menu": _body(MenuItem, menu),
+                    "pickup_locations": _body(PickupLocation, locations),
+                    "time_slots": _body(TimeSlot, slots),
+                },
+                location_ids={location.name: location.id for location in locations},
+                slot_ids={slot.time: slot.id for slot in slots},
+            )
+            self.reloads += 1
+            return self._snapshot
+
+    async def bump(self, db: AsyncSession) -> None:
+        """Mark reference data changed; call inside the admin change's transaction."""
+        await db.execute(
+            update(ReferenceDataVersion)
+            .where(ReferenceDataVersion.id == _VERSION_ROW)
+            .values(version=ReferenceDataVersion.version + 1)
+        )
+
+    async def response(self, request: Request, kind: str) -> Response:
+        snapshot = self._snapshot
+        if snapshot is None:
+            async with AsyncSessionLocal() as db:
+                snapshot = await self.reload(db)
+        return json_response(request, snapshot.bodies[kind], cache_control=self.cache_control)
+
+    async def location_id(self, db: AsyncSession, name: str) -> Optional[int]:
+        """Id of the pickup location called *name*, or None if there is none."""
+        return await self._resolve(db, "location_ids", PickupLocationModel.id, PickupLocationModel.name, name)
+
+    async def slot_id(self, db: AsyncSession, label: str) -> Optional[int]:
+        """Id of the time slot labelled *label*, or None if there is none."""
+        return await self._resolve(db, "slot_ids", TimeSlotModel.id, TimeSlotModel.time, label)
+
+    async def _resolve(self, db: AsyncSession, ids: str, id_column, name_column, name: str) -> Optional[int]:
+        snapshot = self._snapshot
+        if snapshot is not None and name in getattr(snapshot, ids):
+            return getattr(snapshot, ids)[name]
+        # Added on another worker since our last poll, or simply unknown
+        self.lookup_misses += 1
+        return await db.scalar(select(id_column).where(name_column == name))
+
+    # ── lifecycle ────────────────────────────────────────────────────
+    async def start(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await self.reload(db)
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    version = await db.scalar(
+                        select(ReferenceDataVersion.version).where(ReferenceDataVersion.id == _VERSION_ROW)
+                    )
+                    if self._snapshot is None or version != self._snapshot.version:
+                        await self.reload(db)
+            except Exception:
+                LOGGER.exception("Reference data refresh failed; serving version %s",
+                                 self._snapshot.version if self._snapshot else None)
+
+    def stats(self) -> dict:
+        return {
+            "version": self._snapshot.version if self._snapshot else None,
+            "reloads": self.reloads,
+            "lookup_misses": self.lookup_misses,
+        }
+
+
+reference_data = ReferenceData(
+    poll_interval=float(os.getenv("REFERENCE_DATA_POLL_SECONDS", "10")),
+    max_age=int(os.getenv("REFERENCE_DATA_MAX_AGE", "30")),
+)
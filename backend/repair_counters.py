@@ -0,0 +1,51 @@
+"""Recompute the denormalised like/comment counters from the source tables.
+
+The like and comment handlers keep ``posts.likes_count``,
+``posts.comments_count`` and ``comments.likes_count`` up to date as they
+write, so this is only needed after manual data fixes or when the columns
+are first added.  Run it from the repo root:
+
+    python -m backend.repair_counters
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import func, select, update
+
+from .models import Comment, Post, comment_likes, post_likes
+
+
+async def recompute_counters(conn) -> None:
+    """Rewrite every counter.  *conn* may be an AsyncConnection or AsyncSession."""
+    await conn.execute(
+        update(Post).values(
+            likes_count=select(func.count())
+            .where(post_likes.c.post_id == Post.id)
+            .scalar_subquery(),
+            comments_count=select(func.count(Comment.id))
+            .where(Comment.post_id == Post.id)
+            .scalar_subquery(),
+        )
+    )
+    await conn.execute(
+        update(Comment).values(
+            likes_count=select(func.count())
+            .where(comment_likes.c.comment_id == Comment.id)
+            .scalar_subquery(),
+        )
+    )
+
+
+async def main() -> None:
+    from .database import engine
+
+    async with engine.begin() as conn:
+        await recompute_counters(conn)
+    await engine.dispose()
+    print("Counters recomputed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
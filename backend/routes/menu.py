@@ -6,18 +6,24 @@ frontend hits look like:
   GET  /api/menu/today
   GET  /api/pickup-locations
   GET  /api/time-slots
+  POST /api/menu, PUT /api/menu/{item_id}           (admin)
+  POST /api/pickup-locations, POST /api/time-slots  (admin)
+  GET  /api/slot-capacity
+  PUT  /api/pickup-locations/{location_id}/time-slots/{slot_id}/capacity  (admin)
   POST /api/orders
   GET  /api/orders/me
   GET  /api/orders/{order_id}
 """
 
+from datetime import datetime, timezone
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth import get_current_user
+from ..auth import get_admin_user, get_current_user
 from ..database import get_db
 from ..models import (
     MenuItem as MenuItemModel,
@@ -31,72 +37,136 @@ from ..schemas.menu import (
     MenuItemCreate,
     MenuItemUpdate,
     PickupLocation,
+    PickupLocationCreate,
+    SlotAvailability,
+    SlotCapacitySet,
     TimeSlot,
+    TimeSlotCreate,
 )
 from ..schemas.order import Order, OrderCreate, OrderUpdate
 from .. import google_sheets
+from ..inventory import claim_item
+from .. import slots
+from ..reference_data import reference_data
+from .. import outbox
+from ..outbox import outbox_dispatcher
 
 
 router = APIRouter()
 
 
+async def _save_reference_change(db: AsyncSession, row, conflict_detail: str) -> None:
+    """Commit an admin change to reference data and reload the snapshot."""
+    try:
+        await reference_data.bump(db)  # autoflushes the change first
+        await db.commit()
+    except IntegrityError:
+        # Names and time slot labels are unique
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=conflict_detail)
+    await db.refresh(row)
+    await reference_data.reload(db)
+
+
 # ───────────────────────────────── Menu items ────────────────────────────────
 
 
 @router.get("/menu/today", response_model=List[MenuItem])
-async def get_todays_menu(db: AsyncSession = Depends(get_db)):
+async def get_todays_menu(request: Request):
     """Return all menu items that are marked available for today."""
-    res = await db.execute(select(MenuItemModel).where(MenuItemModel.is_available))
-    items = res.scalars().all()
-
-    if not items:
-        # seed defaults
-        defaults = [
-            MenuItemModel(name="Bacon Wrapped Hotdogs", description="Delicious bacon wrapped dogs", price="$5"),
-        ]
-        db.add_all(defaults)
-        await db.commit()
-        items = defaults
+    return await reference_data.response(request, "menu")
+
+
+@router.post("/menu", response_model=MenuItem, status_code=status.HTTP_201_CREATED)
+async def create_menu_item(
+    item: MenuItemCreate,
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    db_item = MenuItemModel(**item.model_dump())
+    db.add(db_item)
+    await _save_reference_change(db, db_item, "Menu item already exists")
+    return MenuItem.model_validate(db_item, from_attributes=True)
+
 
-    return items
+@router.put("/menu/{item_id}", response_model=MenuItem)
+async def update_menu_item(
+    item_id: int,
+    item_update: MenuItemUpdate,
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    db_item = await db.get(MenuItemModel, item_id)
+    if db_item is None:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    for field, value in item_update.model_dump(exclude_unset=True).items():
+        setattr(db_item, field, value)
+    await _save_reference_change(db, db_item, "Menu item already exists")
+    return MenuItem.model_validate(db_item, from_attributes=True)
 
 
 # ─────────────────────────────── Pickup / TimeSlot ───────────────────────────
 
 
 @router.get("/pickup-locations", response_model=List[PickupLocation])
-async def get_pickup_locations(db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(PickupLocationModel))
-    locs = res.scalars().all()
-
-    if not locs:
-        defaults = [
-            PickupLocationModel(name="Kappa Sigma", address="You know where its at"),
-            PickupLocationModel(name="Sigma Nu", address="557 Mayfield Ave, Stanford"),
-            PickupLocationModel(name="White Plaza", address="White Memorial Plaza, Stanford"),
-        ]
-        db.add_all(defaults)
-        await db.commit()
-        locs = defaults
-
-    return locs
+async def get_pickup_locations(request: Request):
+    return await reference_data.response(request, "pickup_locations")
 
 
 @router.get("/time-slots", response_model=List[TimeSlot])
-async def get_time_slots(db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(TimeSlotModel))
-    slots = res.scalars().all()
-
-    if not slots:
-        # simple hourly slots seed
-        defaults = [
-            TimeSlotModel(time="9:30 PM - 10:30 PM"),
-        ]
-        db.add_all(defaults)
-        await db.commit()
-        slots = defaults
+async def get_time_slots(request: Request):
+    return await reference_data.response(request, "time_slots")
+
+
+@router.post("/pickup-locations", response_model=PickupLocation, status_code=status.HTTP_201_CREATED)
+async def create_pickup_location(
+    location: PickupLocationCreate,
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    db_location = PickupLocationModel(**location.model_dump())
+    db.add(db_location)
+    await _save_reference_change(db, db_location, "Pickup location already exists")
+    return PickupLocation.model_validate(db_location, from_attributes=True)
+
 
-    return slots
+@router.post("/time-slots", response_model=TimeSlot, status_code=status.HTTP_201_CREATED)
+async def create_time_slot(
+    slot: TimeSlotCreate,
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    db_slot = TimeSlotModel(**slot.model_dump())
+    db.add(db_slot)
+    await _save_reference_change(db, db_slot, "Time slot already exists")
+    return TimeSlot.model_validate(db_slot, from_attributes=True)
+
+
+# ─────────────────────────────── Slot capacity ───────────────────────────────
+
+
+@router.get("/slot-capacity", response_model=List[SlotAvailability])
+async def get_slot_capacity(db: AsyncSession = Depends(get_db)):
+    """Remaining capacity for every pickup location x time slot pair."""
+    return await slots.availability(db)
+
+
+@router.put(
+    "/pickup-locations/{location_id}/time-slots/{slot_id}/capacity",
+    response_model=SlotAvailability,
+)
+async def set_slot_capacity(
+    location_id: int,
+    slot_id: int,
+    body: SlotCapacitySet,
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    if await db.get(PickupLocationModel, location_id) is None:
+        raise HTTPException(status_code=404, detail="Pickup location not found")
+    if await db.get(TimeSlotModel, slot_id) is None:
+        raise HTTPException(status_code=404, detail="Time slot not found")
+    return await slots.set_capacity(db, location_id, slot_id, body.capacity)
 
 
 # ─────────────────────────────────── Orders ──────────────────────────────────
@@ -110,40 +180,47 @@ async def create_order(
 ):
     """Create a new order for the authenticated user."""
 
-    res = await db.execute(
-        select(MenuItemModel).where(
-            MenuItemModel.id == order.menu_item_id,
-            MenuItemModel.is_available,
-        )
-    )
-    menu_item = res.scalar_one_or_none()
-    if menu_item is None:
-        raise HTTPException(status_code=404, detail="Menu item not available")
+    menu_item_name, sold_out = await claim_item(db, order.menu_item_id)
+    if sold_out:
+        # Last unit: take the item off the menu everywhere
+        await reference_data.bump(db)
+    location_id = await reference_data.location_id(db, order.pickup_location)
+    slot_id = await reference_data.slot_id(db, order.time_slot)
+    await slots.book_slot(db, location_id, slot_id)
 
     db_order = OrderModel(
         user_id=current_user.id,
         menu_item_id=order.menu_item_id,
         pickup_location=order.pickup_location,
         time_slot=order.time_slot,
+        pickup_location_id=location_id,
+        time_slot_id=slot_id,
         details=order.details,
+        status="pending",
+        # Set here rather than by the database so the sheet row can carry it
+        created_at=datetime.now(timezone.utc),
     )
 
     db.add(db_order)
+    await db.flush()  # assigns the id the sheet row is keyed on
+    # Exported to the Google Sheet by the outbox dispatcher (skipped if not configured)
+    outbox.publish(db, outbox.SHEETS_ORDER_ROW, {
+        "row": google_sheets.order_row(
+            order_id=db_order.id,
+            created_at=db_order.created_at,
+            user_name=current_user.name,
+            menu_item=menu_item_name,
+            details=db_order.details,
+            location=db_order.pickup_location,
+            time_slot=db_order.time_slot,
+            status=db_order.status,
+        ),
+    })
     await db.commit()
+    outbox_dispatcher.notify()
     await db.refresh(db_order)
-
-    # Write to Google Sheet (no-op if not configured)
-    try:
-        google_sheets.append_order(
-            user_name=current_user.name,
-            menu_item=menu_item.name,
-            details=order.details,
-            location=order.pickup_location,
-        )
-    except Exception as exc:  # don't block if Sheets fails
-        import logging
-
-        logging.getLogger(__name__).warning("Google Sheets append failed: %s", exc)
+    if sold_out:
+        await reference_data.reload(db)
 
     return db_order
 
@@ -1,76 +1,158 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Union
 import json
+import orjson
 
 from ..database import get_db
-from ..auth import get_current_user
+from ..feed_cache import feed_cache
+from .. import likes
+from ..like_buffer import like_buffer
+from ..singleflight import flight_key, reads
+from ..feed_loader import (
+    MAX_THREAD_DEPTH, fetch_liked_ids, load_comment, load_comment_page, load_post, load_posts,
+    resolve_like_status, thread_query,
+)
+from ..serialization import dumps, json_array, json_response, post_deleted, post_json
+from ..auth import get_current_user, get_optional_user
+from ..reference_data import reference_data
+from ..pagination import InvalidCursor, before_cursor, decode_cursor, encode_cursor
 from ..models import Post as PostModel, Comment as CommentModel, User as UserModel, Order as OrderModel, MenuItem as MenuItemModel
 from ..schemas import (
-    Post, PostCreate, PostUpdate, PostWithLikeStatus,
-    Comment, CommentCreate, CommentUpdate, CommentWithLikeStatus,
+    Post, PostCreate, PostUpdate, PostWithLikeStatus, PostPage,
+    Comment, CommentCreate, CommentUpdate, CommentWithLikeStatus, CommentPage,
     LikeResponse
 )
 
 router = APIRouter()
 
 
-@router.get("/posts", response_model=List[PostWithLikeStatus])
+@router.get("/posts", response_model=Union[PostPage, List[PostWithLikeStatus]])
 async def get_posts(
+    request: Request,
     location_filter: Optional[str] = Query(None),
     user_id: Optional[int] = Query(None),
-    limit: int = Query(20, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    offset: Optional[int] = Query(None, ge=0, description="Legacy offset paging; returns a bare list"),
+    viewer: Optional[UserModel] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get posts with optional location filtering"""
-    query = select(PostModel).options(
-        joinedload(PostModel.author),
-        joinedload(PostModel.comments).joinedload(CommentModel.author),
-        joinedload(PostModel.comments).joinedload(CommentModel.liked_by),
-        joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.author),
-        joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.liked_by),
-        joinedload(PostModel.liked_by)
+    """Get posts with optional location filtering.
+
+    By default pages are keyset-paginated and wrapped in ``{items, next_cursor}``
+    and served from the feed cache.  Passing ``offset`` keeps the old
+    behaviour of returning a bare list.  Bodies are built by the orjson fast
+    path and carry an ETag (304 on If-None-Match).
+    """
+    location = location_filter if location_filter and location_filter != "all" else None
+    viewer_id = viewer.id if viewer else user_id
+
+    if offset is not None:
+        query = _feed_query(location).offset(offset).limit(limit)
+        posts = [PostWithLikeStatus.model_validate(post) for post in await load_posts(db, query)]
+        return json_response(request, json_array(await _post_bodies(db, viewer_id, posts)))
+
+    position = _decode_position(cursor)
+
+    async def load_page(session: AsyncSession) -> PostPage:
+        return await _load_feed_page(session, location, position, limit)
+
+    page = await feed_cache.get_or_load((location, cursor, limit), load_page)
+
+    items = json_array(await _post_bodies(db, viewer_id, page.items))
+    body = b'{"items":' + items + b',"next_cursor":' + orjson.dumps(page.next_cursor) + b"}"
+    return json_response(request, body)
+
+
+async def _post_bodies(db: AsyncSession, viewer_id: Optional[int], posts) -> List[bytes]:
+    """Serialised posts with the viewer's like flags; *posts* are not mutated."""
+    liked_posts, liked_comments = await fetch_liked_ids(
+        db,
+        viewer_id,
+        {post.id for post in posts},
+        {comment.id for post in posts for comment in post.comments},
     )
-    
-    if location_filter and location_filter != "all":
+    return [post_json(post, liked_posts, liked_comments) for post in posts]
+
+
+def _decode_position(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+def _touch_post(post_id: int):
+    """Bump a post's version so its cached body and ETag roll over."""
+    return update(PostModel).where(PostModel.id == post_id).values(version=PostModel.version + 1)
+
+
+def _feed_query(location: Optional[str]):
+    query = select(PostModel)
+    if location:
         query = query.filter(
-            (PostModel.location_filter == location_filter) | 
+            (PostModel.location_filter == location) | 
             (PostModel.location_filter.is_(None))
         )
-    
-    result = await db.execute(query.order_by(PostModel.created_at.desc()).offset(offset).limit(limit))
-    posts = result.unique().scalars().all()
-    
-    # Add like status for current user
-    posts_with_like_status = []
-    for post in posts:
-        post_data = PostWithLikeStatus.model_validate(post)
-        if user_id:
-            post_data.is_liked_by_user = any(user.id == user_id for user in post.liked_by)
-        posts_with_like_status.append(post_data)
-    
-    return posts_with_like_status
+    return query.order_by(PostModel.created_at.desc(), PostModel.id.desc())
+
+
+async def _load_feed_page(db: AsyncSession, location: Optional[str], position, limit: int) -> PostPage:
+    """Build one viewer-independent keyset page of the feed."""
+    query = _feed_query(location)
+    if position is not None:
+        query = query.filter(
+            before_cursor(PostModel.created_at, PostModel.id, position, db.bind.dialect.name)
+        )
+    # Fetch one extra row to know whether another page exists
+    posts = await load_posts(db, query.limit(limit + 1))
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id)
+    return PostPage(
+        items=[PostWithLikeStatus.model_validate(post) for post in posts],
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/users-by-location/{location}")
-async def get_users_by_location(
-    location: str,
-    db: AsyncSession = Depends(get_db)
-):
+async def get_users_by_location(location: str):
     """Get all users picking up at a specific location with their orders"""
+    return await reads.do(
+        flight_key("users-by-location", location=location),
+        lambda db: _load_users_by_location(db, location),
+    )
+
+
+async def _at_location(db: AsyncSession, location: str):
+    """Filter orders picked up at *location* (a name) through the indexed id."""
+    location_id = await reference_data.location_id(db, location)
+    if location_id is None:
+        # Free-text location that matches no pickup_locations row
+        return OrderModel.pickup_location == location
+    return OrderModel.pickup_location_id == location_id
+
+
+async def _load_users_by_location(db: AsyncSession, location: str):
     query = (
         select(UserModel)
         .join(OrderModel)
         .join(MenuItemModel)
         .options(joinedload(UserModel.orders).joinedload(OrderModel.menu_item))
-        .filter(OrderModel.pickup_location == location)
+        .filter(await _at_location(db, location))
     )
     result = await db.execute(query)
     users = result.unique().scalars().all()
-    return users
+    # Shared between coalesced requests, so encode once into plain data
+    return jsonable_encoder(users)
 
 
 @router.post("/user-profile-post/{user_id}")
@@ -93,14 +175,7 @@ async def create_or_get_user_profile_post(
     
     if existing_post:
         # Reload with relationships
-        rel = select(PostModel).options(
-            joinedload(PostModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.liked_by),
-            joinedload(PostModel.liked_by)
-        ).filter(PostModel.id == existing_post.id)
-        res_rel = await db.execute(rel)
-        return res_rel.unique().scalar_one()
+        return await load_post(db, existing_post.id)
     
     # Get user info
     user_result = await db.execute(select(UserModel).filter(UserModel.id == user_id))
@@ -114,7 +189,7 @@ async def create_or_get_user_profile_post(
         .options(joinedload(OrderModel.menu_item))
         .filter(
             OrderModel.user_id == user_id,
-            OrderModel.pickup_location == location
+            await _at_location(db, location)
         )
         .limit(1)
     )
@@ -131,17 +206,11 @@ async def create_or_get_user_profile_post(
     
     db.add(profile_post)
     await db.commit()
+    feed_cache.post_created(location)
     await db.refresh(profile_post)
     
     # Return with relationships
-    rel = select(PostModel).options(
-        joinedload(PostModel.author),
-        joinedload(PostModel.comments).joinedload(CommentModel.author),
-        joinedload(PostModel.comments).joinedload(CommentModel.liked_by),
-        joinedload(PostModel.liked_by)
-    ).filter(PostModel.id == profile_post.id)
-    res_rel = await db.execute(rel)
-    return res_rel.unique().scalar_one()
+    return await load_post(db, profile_post.id)
 
 
 @router.post("/posts", response_model=PostWithLikeStatus)
@@ -159,20 +228,11 @@ async def create_post(
     )
     db.add(db_post)
     await db.commit()
+    feed_cache.post_created(db_post.location_filter)
     await db.refresh(db_post)
     
     # Load relationships
-    result = await db.execute(
-        select(PostModel).options(
-            joinedload(PostModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.liked_by),
-            joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.liked_by),
-            joinedload(PostModel.liked_by)
-        ).filter(PostModel.id == db_post.id)
-    )
-    db_post = result.unique().scalar_one()
+    db_post = await load_post(db, db_post.id)
     
     post_data = PostWithLikeStatus.model_validate(db_post)
     
@@ -182,21 +242,13 @@ async def create_post(
 @router.get("/posts/{post_id}", response_model=PostWithLikeStatus)
 async def get_post(
     post_id: int, 
+    request: Request,
     user_id: Optional[int] = Query(None),
+    viewer: Optional[UserModel] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific post by ID"""
-    result = await db.execute(
-        select(PostModel).options(
-            joinedload(PostModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.liked_by),
-            joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.liked_by),
-            joinedload(PostModel.liked_by)
-        ).filter(PostModel.id == post_id)
-    )
-    post = result.unique().scalar_one_or_none()
+    post = await load_post(db, post_id)
     
     if not post:
         raise HTTPException(
@@ -205,10 +257,8 @@ async def get_post(
         )
     
     post_data = PostWithLikeStatus.model_validate(post)
-    if user_id:
-        post_data.is_liked_by_user = any(user.id == user_id for user in post.liked_by)
-    
-    return post_data
+    [body] = await _post_bodies(db, viewer.id if viewer else user_id, [post_data])
+    return json_response(request, body)
 
 
 @router.put("/posts/{post_id}", response_model=PostWithLikeStatus)
@@ -235,27 +285,22 @@ async def update_post(
         )
     
     # Update post fields
+    old_location = post.location_filter
     for field, value in post_update.model_dump(exclude_unset=True).items():
         setattr(post, field, value)
+    post.version = PostModel.version + 1
     
     await db.commit()
+    feed_cache.post_changed(post_id)
+    if post.location_filter != old_location:
+        feed_cache.post_moved(post.location_filter)
     await db.refresh(post)
     
     # Reload with relationships
-    result = await db.execute(
-        select(PostModel).options(
-            joinedload(PostModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.liked_by),
-            joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.author),
-            joinedload(PostModel.comments).joinedload(CommentModel.replies).joinedload(CommentModel.liked_by),
-            joinedload(PostModel.liked_by)
-        ).filter(PostModel.id == post_id)
-    )
-    post = result.unique().scalar_one()
+    post = await load_post(db, post_id)
     
     post_data = PostWithLikeStatus.model_validate(post)
-    post_data.is_liked_by_user = any(user.id == current_user.id for user in post.liked_by)
+    await resolve_like_status(db, current_user.id, posts=[post_data])
     
     return post_data
 
@@ -284,6 +329,8 @@ async def delete_post(
     
     await db.delete(post)
     await db.commit()
+    feed_cache.post_changed(post_id)
+    post_deleted(post_id)
     
     return {"message": "Post deleted successfully"}
 
@@ -295,34 +342,23 @@ async def toggle_post_like(
     db: AsyncSession = Depends(get_db)
 ):
     """Toggle like on a post"""
-    result = await db.execute(
-        select(PostModel).options(joinedload(PostModel.liked_by)).filter(PostModel.id == post_id)
-    )
-    post = result.unique().scalar_one_or_none()
-    if not post:
+    if like_buffer.enabled:
+        # Acknowledged now, written by the next buffer flush
+        toggled = await like_buffer.toggle(db, current_user.id, post_id)
+    else:
+        toggled = await likes.toggle_post_like(db, current_user.id, post_id)
+    if toggled is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
+    liked, likes_count = toggled
     
-    # Check if user already liked the post
-    is_liked = any(liked_user.id == current_user.id for liked_user in post.liked_by)
-    
-    if is_liked:
-        # Remove like
-        post.liked_by = [liked_user for liked_user in post.liked_by if liked_user.id != current_user.id]
-        liked = False
-    else:
-        # Add like
-        post.liked_by.append(current_user)
-        liked = True
-    
-    await db.commit()
-    await db.refresh(post)
-    
-    response = LikeResponse(liked=liked, likes_count=post.likes_count)
+    if not like_buffer.enabled:
+        await db.commit()
+        feed_cache.post_changed(post_id)
     
-    return response
+    return LikeResponse(liked=liked, likes_count=likes_count)
 
 
 @router.post("/posts/{post_id}/comments", response_model=CommentWithLikeStatus)
@@ -360,41 +396,92 @@ async def create_comment(
         parent_id=comment.parent_id
     )
     db.add(db_comment)
+    post.comments_count = PostModel.comments_count + 1
+    post.version = PostModel.version + 1
     await db.commit()
+    feed_cache.post_changed(post_id)
     await db.refresh(db_comment)
     
     # Load relationships
-    result = await db.execute(
-        select(CommentModel).options(
-            joinedload(CommentModel.author),
-            joinedload(CommentModel.liked_by),
-            joinedload(CommentModel.replies).joinedload(CommentModel.author),
-            joinedload(CommentModel.replies).joinedload(CommentModel.liked_by)
-        ).filter(CommentModel.id == db_comment.id)
-    )
-    db_comment = result.unique().scalar_one()
+    db_comment = await load_comment(db, db_comment.id)
     
     comment_data = CommentWithLikeStatus.model_validate(db_comment)
     
     return comment_data
 
 
+@router.get("/posts/{post_id}/comments", response_model=CommentPage)
+async def get_post_comments(
+    post_id: int,
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="A post's comments_next_cursor, or a page's next_cursor"),
+    depth: int = Query(0, ge=0, le=MAX_THREAD_DEPTH, description="Levels of replies to include under each comment"),
+    user_id: Optional[int] = Query(None),
+    viewer: Optional[UserModel] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Page through a post's top-level comments, oldest first"""
+    position = _decode_position(cursor)
+    if await db.scalar(select(PostModel.id).filter(PostModel.id == post_id)) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+    return await _comment_page(
+        request, db, thread_query(post_id=post_id), position, limit, depth, viewer.id if viewer else user_id
+    )
+
+
+@router.get("/comments/{comment_id}/replies", response_model=CommentPage)
+async def get_comment_replies(
+    comment_id: int,
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="A comment's replies_next_cursor, or a page's next_cursor"),
+    depth: int = Query(0, ge=0, le=MAX_THREAD_DEPTH, description="Levels of replies to include under each comment"),
+    user_id: Optional[int] = Query(None),
+    viewer: Optional[UserModel] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Page through the direct replies to a comment, oldest first"""
+    position = _decode_position(cursor)
+    if await db.scalar(select(CommentModel.id).filter(CommentModel.id == comment_id)) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+    return await _comment_page(
+        request, db, thread_query(parent_id=comment_id), position, limit, depth, viewer.id if viewer else user_id
+    )
+
+
+async def _comment_page(
+    request: Request, db: AsyncSession, query, position, limit: int, depth: int, viewer_id: Optional[int]
+):
+    comments, next_cursor = await load_comment_page(db, query, position, limit, depth)
+    page = CommentPage(
+        items=[CommentWithLikeStatus.model_validate(comment) for comment in comments],
+        next_cursor=next_cursor,
+    )
+    await resolve_like_status(db, viewer_id, comments=page.items)
+    return json_response(request, dumps(page))
+
+
 @router.get("/comments/{comment_id}", response_model=CommentWithLikeStatus)
 async def get_comment(
     comment_id: int,
+    request: Request,
+    depth: Optional[int] = Query(
+        None, ge=0, le=MAX_THREAD_DEPTH,
+        description="Include the whole reply subtree this many levels deep instead of a preview",
+    ),
     user_id: Optional[int] = Query(None),
+    viewer: Optional[UserModel] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a specific comment by ID"""
-    result = await db.execute(
-        select(CommentModel).options(
-            joinedload(CommentModel.author),
-            joinedload(CommentModel.liked_by),
-            joinedload(CommentModel.replies).joinedload(CommentModel.author),
-            joinedload(CommentModel.replies).joinedload(CommentModel.liked_by)
-        ).filter(CommentModel.id == comment_id)
-    )
-    comment = result.unique().scalar_one_or_none()
+    """Get a specific comment by ID, with a preview of its replies or its subtree"""
+    comment = await load_comment(db, comment_id, depth)
     
     if not comment:
         raise HTTPException(
@@ -403,10 +490,9 @@ async def get_comment(
         )
     
     comment_data = CommentWithLikeStatus.model_validate(comment)
-    if user_id:
-        comment_data.is_liked_by_user = any(user.id == user_id for user in comment.liked_by)
+    await resolve_like_status(db, viewer.id if viewer else user_id, comments=[comment_data])
     
-    return comment_data
+    return json_response(request, dumps(comment_data))
 
 
 @router.put("/comments/{comment_id}", response_model=CommentWithLikeStatus)
@@ -435,21 +521,17 @@ async def update_comment(
     # Update comment fields
     for field, value in comment_update.model_dump(exclude_unset=True).items():
         setattr(comment, field, value)
+    await db.execute(_touch_post(comment.post_id))
     
     await db.commit()
+    feed_cache.post_changed(comment.post_id)
     await db.refresh(comment)
     
     # Reload with relationships
-    result = await db.execute(
-        select(CommentModel).options(
-            joinedload(CommentModel.author),
-            joinedload(CommentModel.liked_by)
-        ).filter(CommentModel.id == comment_id)
-    )
-    comment = result.unique().scalar_one()
+    comment = await load_comment(db, comment_id)
     
     comment_data = CommentWithLikeStatus.model_validate(comment)
-    comment_data.is_liked_by_user = any(user.id == current_user.id for user in comment.liked_by)
+    await resolve_like_status(db, current_user.id, comments=[comment_data])
     
     return comment_data
 
@@ -481,7 +563,17 @@ async def delete_comment(
     post = result.unique().scalar_one_or_none()
     
     await db.delete(comment)
+    await db.flush()
+
+    # Replies go with their parent, so recount rather than decrement by one
+    post.comments_count = (
+        select(func.count(CommentModel.id))
+        .where(CommentModel.post_id == post.id)
+        .scalar_subquery()
+    )
+    post.version = PostModel.version + 1
     await db.commit()
+    feed_cache.post_changed(post.id)
     
     return {"message": "Comment deleted successfully"}
 
@@ -493,34 +585,19 @@ async def toggle_comment_like(
     db: AsyncSession = Depends(get_db)
 ):
     """Toggle like on a comment"""
-    result = await db.execute(
-        select(CommentModel).options(joinedload(CommentModel.liked_by)).filter(CommentModel.id == comment_id)
-    )
-    comment = result.unique().scalar_one_or_none()
-    if not comment:
+    toggled = await likes.toggle_comment_like(db, current_user.id, comment_id)
+    if toggled is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Comment not found"
         )
-    
-    # Check if user already liked the comment
-    is_liked = any(liked_user.id == current_user.id for liked_user in comment.liked_by)
-    
-    if is_liked:
-        # Remove like
-        comment.liked_by = [liked_user for liked_user in comment.liked_by if liked_user.id != current_user.id]
-        liked = False
-    else:
-        # Add like
-        comment.liked_by.append(current_user)
-        liked = True
+    liked, likes_count, post_id = toggled
+    await db.execute(_touch_post(post_id))
     
     await db.commit()
-    await db.refresh(comment)
-    
-    response = LikeResponse(liked=liked, likes_count=comment.likes_count)
+    feed_cache.post_changed(post_id)
     
-    return response
+    return LikeResponse(liked=liked, likes_count=likes_count)
 
 
 @router.head("/posts")
@@ -1,8 +1,11 @@
-from .menu import MenuItem, MenuItemCreate, MenuItemUpdate, PickupLocation, TimeSlot
+from .menu import (
+    MenuItem, MenuItemCreate, MenuItemUpdate, PickupLocation, PickupLocationCreate,
+    SlotAvailability, SlotCapacitySet, TimeSlot, TimeSlotCreate,
+)
 from .order import Order, OrderCreate, OrderUpdate
 from .social import (
-    Post, PostCreate, PostUpdate, PostWithLikeStatus,
-    Comment, CommentCreate, CommentUpdate, CommentWithLikeStatus,
+    Post, PostCreate, PostUpdate, PostWithLikeStatus, PostPage,
+    Comment, CommentCreate, CommentUpdate, CommentWithLikeStatus, CommentPage,
     LikeResponse, User, UserOut
 )
 
@@ -23,16 +26,21 @@ class LoginIn(BaseModel):
 class TokenOut(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+class RefreshIn(BaseModel):
+    refresh_token: str
 
 __all__ = [
     # Menu schemas
-    'MenuItem', 'MenuItemCreate', 'MenuItemUpdate', 'PickupLocation', 'TimeSlot',
+    'MenuItem', 'MenuItemCreate', 'MenuItemUpdate', 'PickupLocation', 'PickupLocationCreate',
+    'SlotAvailability', 'SlotCapacitySet', 'TimeSlot', 'TimeSlotCreate',
     # Order schemas
     'Order', 'OrderCreate', 'OrderUpdate',
     # Social schemas
-    'Post', 'PostCreate', 'PostUpdate', 'PostWithLikeStatus',
-    'Comment', 'CommentCreate', 'CommentUpdate', 'CommentWithLikeStatus',
+    'Post', 'PostCreate', 'PostUpdate', 'PostWithLikeStatus', 'PostPage',
+    'Comment', 'CommentCreate', 'CommentUpdate', 'CommentWithLikeStatus', 'CommentPage',
     'LikeResponse', 'User', 'UserOut',
     # Auth schemas
-    'SignupIn', 'LoginIn', 'TokenOut'
+    'SignupIn', 'LoginIn', 'TokenOut', 'RefreshIn'
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # ────────────────────────────── Menu Item ──────────────────────────────
 
@@ -12,6 +12,7 @@ class MenuItemBase(BaseModel):
     description: Optional[str] = None
     price: str
     is_available: bool = True
+    stock_remaining: Optional[int] = Field(None, ge=0)  # None: not stock-tracked
 
 
 class MenuItemCreate(MenuItemBase):
@@ -23,6 +24,7 @@ class MenuItemUpdate(BaseModel):
     description: Optional[str] = None
     price: Optional[str] = None
     is_available: Optional[bool] = None
+    stock_remaining: Optional[int] = Field(None, ge=0)
 
 
 class MenuItem(MenuItemBase):
@@ -36,6 +38,11 @@ class MenuItem(MenuItemBase):
 
 # ────────────────────────── Pickup Location ───────────────────────────
 
+class PickupLocationCreate(BaseModel):
+    name: str
+    address: str
+
+
 class PickupLocation(BaseModel):
     id: int
     name: str
@@ -48,10 +55,30 @@ class PickupLocation(BaseModel):
 
 # ────────────────────────────── Time Slot ──────────────────────────────
 
+class TimeSlotCreate(BaseModel):
+    time: str
+
+
 class TimeSlot(BaseModel):
     id: int
     time: str
     created_at: datetime
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+
+# ─────────────────────────── Slot capacity ────────────────────────────
+
+class SlotCapacitySet(BaseModel):
+    capacity: int = Field(..., ge=0)
+
+
+class SlotAvailability(BaseModel):
+    pickup_location_id: int
+    pickup_location: str
+    time_slot_id: int
+    time_slot: str
+    capacity: Optional[int] = None  # None: unlimited
+    booked: Optional[int] = None
+    remaining: Optional[int] = None
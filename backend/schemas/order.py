@@ -29,6 +29,8 @@ class OrderUpdate(BaseModel):
 class Order(OrderBase):
     id: int
     user_id: int
+    pickup_location_id: Optional[int] = None
+    time_slot_id: Optional[int] = None
     status: str
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -44,13 +44,20 @@ class Post(PostBase):
     author: User
     likes_count: int
     comments_count: int
+    version: int = 1
+    # First few top-level comments; fetch the rest from /posts/{id}/comments
     comments: List[Comment] = []
+    comments_next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 class PostWithLikeStatus(Post):
     is_liked_by_user: Optional[bool] = False
 
+class PostPage(BaseModel):
+    items: List[PostWithLikeStatus]
+    next_cursor: Optional[str] = None
+
 # Comment schemas
 class CommentBase(BaseModel):
     content: str
@@ -70,12 +77,20 @@ class Comment(CommentBase):
     updated_at: Optional[datetime] = None
     author: User
     likes_count: int
+    replies_count: int = 0
+    # Only a preview (or nothing, in the feed); page through /comments/{id}/replies
     replies: List['Comment'] = []
+    replies_next_cursor: Optional[str] = None
+    is_liked_by_user: Optional[bool] = False
 
     model_config = ConfigDict(from_attributes=True)
 
 class CommentWithLikeStatus(Comment):
-    is_liked_by_user: Optional[bool] = False
+    pass
+
+class CommentPage(BaseModel):
+    items: List[CommentWithLikeStatus]
+    next_cursor: Optional[str] = None
 
 # Like response
 class LikeResponse(BaseModel):
@@ -0,0 +1,124 @@
+"""Fast JSON path for the social feed read endpoints.
+
+Returning schema objects from a handler makes FastAPI validate them a second
+time against ``response_model`` and then walk them through
+``jsonable_encoder``.  The feed endpoints instead build their body with
+orjson, reuse the serialised bytes of each post while its ``version`` is
+unchanged, and answer with a strong ETag so polling clients get a bodyless
+304 when nothing moved.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Collection, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from .feed_loader import iter_comments
+from .schemas import PostWithLikeStatus
+
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(model: BaseModel) -> bytes:
+    return orjson.dumps(model.model_dump(), option=JSON_OPTIONS)
+
+
+class BytesCache:
+    """Bounded LRU of serialised JSON fragments."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, match: Callable[[Hashable], bool]) -> None:
+        for key in [key for key in self._entries if match(key)]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+post_bytes = BytesCache(max_entries=4096)
+
+
+def _like_signature(
+    post: PostWithLikeStatus, liked_posts: Collection[int], liked_comments: Collection[int]
+) -> Tuple[bool, FrozenSet[int]]:
+    if not liked_comments:
+        return post.id in liked_posts, frozenset()
+    return (
+        post.id in liked_posts,
+        frozenset(c.id for c in iter_comments(post.comments) if c.id in liked_comments),
+    )
+
+
+def post_json(
+    post: PostWithLikeStatus,
+    liked_posts: Collection[int] = (),
+    liked_comments: Collection[int] = (),
+) -> bytes:
+    """Serialise *post* as seen by a viewer who liked the given ids.
+
+    The cache key is the post's row version plus the viewer's likes inside
+    it, so everyone who has not liked anything there shares one entry.
+    ``created_at`` is in the key too: SQLite reuses the id of a deleted
+    post, and the new post starts again at version 1.  The shared *post*
+    object itself is never mutated.
+    """
+    liked, liked_in_thread = _like_signature(post, liked_posts, liked_comments)
+    key = (post.id, post.created_at, post.version, liked, liked_in_thread)
+    body = post_bytes.get(key)
+    if body is None:
+        if liked or liked_in_thread:
+            post = post.model_copy(deep=True)
+            post.is_liked_by_user = liked
+            for comment in iter_comments(post.comments):
+                comment.is_liked_by_user = comment.id in liked_in_thread
+        body = dumps(post)
+        post_bytes.put(key, body)
+    return body
+
+
+def post_deleted(post_id: int) -> None:
+    """Drop every cached body of *post_id* in this worker."""
+    post_bytes.discard(lambda key: key[0] == post_id)
+
+
+def json_array(parts: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(parts) + b"]"
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def json_response(request: Request, body: bytes, cache_control: str = "no-cache") -> Response:
+    """200 with a strong ETag, or 304 if the client already has this body."""
+    etag = etag_for(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,102 @@
+"""In-memory stand-in for the Sheets ``spreadsheets().values()`` resource.
+
+Supports ``get``, ``batchUpdate`` and ``append`` with the same request and
+response shapes as the real API, on one grid of string cells.  Like the
+real API, ``get`` trims trailing empty cells and rows.  ``calls`` counts
+requests per method, so a run's API cost can be checked.  Used by
+``python -m backend.reconcile_sheet --fake`` and handy in tests:
+
+    values = FakeValues([["1", "2024-05-01T21:30:00", ...]])
+    plan = await reconcile(db, values, "sheet-id")
+    assert values.calls["batchUpdate"] == 1
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Callable, List, Optional, Sequence
+
+_A1 = re.compile(r"^(?:[^!]+!)?([A-Z]+)(\d*)(?::([A-Z]+)(\d*))?$")
+
+
+def _column(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _parse(a1: str):
+    """``Sheet1!B2:D9`` -> (first row, first col, last row or None, last col), 0-based."""
+    match = _A1.match(a1)
+    if match is None:
+        raise ValueError(f"Unsupported range {a1!r}")
+    col1, row1, col2, row2 = match.groups()
+    first_row = int(row1) - 1 if row1 else 0
+    last_row = int(row2) - 1 if row2 else None
+    return first_row, _column(col1), last_row, _column(col2 or col1)
+
+
+class _Request:
+    def __init__(self, run: Callable[[], dict]):
+        self._run = run
+
+    def execute(self) -> dict:
+        return self._run()
+
+
+class FakeValues:
+    def __init__(self, rows: Optional[Sequence[Sequence[str]]] = None):
+        self.rows: List[List[str]] = [list(row) for row in rows or []]
+        self.calls: Counter = Counter()
+
+    def _write(self, first_row: int, first_col: int, values: Sequence[Sequence]) -> None:
+        for offset, row in enumerate(values):
+            number = first_row + offset
+            while len(self.rows) <= number:
+                self.rows.append([])
+            cells = self.rows[number]
+            while len(cells) < first_col + len(row):
+                cells.append("")
+            cells[first_col:first_col + len(row)] = ["" if value is None else str(value) for value in row]
+
+    def get(self, spreadsheetId: str, range: str, **kwargs) -> _Request:
+        def run():
+            self.calls["get"] += 1
+            first_row, first_col, last_row, last_col = _parse(range)
+            stop = len(self.rows) if last_row is None else last_row + 1
+            values = []
+            for cells in self.rows[first_row:stop]:
+                row = cells[first_col:last_col + 1]
+                while row and row[-1] == "":
+                    row.pop()
+                values.append(row)
+            while values and not values[-1]:
+                values.pop()
+            result = {"range": range, "majorDimension": "ROWS"}
+            if values:
+                result["values"] = values
+            return result
+        return _Request(run)
+
+    def batchUpdate(self, spreadsheetId: str, body: dict) -> _Request:
+        def run():
+            self.calls["batchUpdate"] += 1
+            cells = 0
+            for value_range in body["data"]:
+                first_row, first_col, _, _ = _parse(value_range["range"])
+                self._write(first_row, first_col, value_range["values"])
+                cells += sum(len(row) for row in value_range["values"])
+            return {"totalUpdatedCells": cells, "totalUpdatedRows": sum(len(d["values"]) for d in body["data"])}
+        return _Request(run)
+
+    def append(self, spreadsheetId: str, range: str, body: dict, **kwargs) -> _Request:
+        def run():
+            self.calls["append"] += 1
+            used = len(self.rows)
+            while used and not any(self.rows[used - 1]):
+                used -= 1
+            self._write(used, _parse(range)[1], body["values"])
+            return {"updates": {"updatedRows": len(body["values"])}}
+        return _Request(run)
@@ -0,0 +1,64 @@
+"""Request coalescing for hot read endpoints.
+
+When a burst of identical reads arrives together (everyone's phone refreshes
+right after a new post lands) only the first one queries the database; the
+rest await the same in-flight call and share its result.
+
+Each flight runs on its own ``AsyncSession`` rather than the leader's request
+session, so a leader that goes away does not take its followers' query with
+it.  Results are shared between requests and must be treated as read-only:
+return schema objects or plain data, not live ORM instances.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal
+
+T = TypeVar("T")
+
+
+def flight_key(name: str, **params: Any) -> Tuple[Hashable, ...]:
+    """Key a call by endpoint name and its normalised query parameters."""
+    return (name, *sorted(params.items()))
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Run ``fn(session)`` once per *key* among concurrent callers."""
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(self._run(fn))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.followers += 1
+        # shield: one caller being cancelled must not cancel the shared call
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _run(fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        async with AsyncSessionLocal() as session:
+            return await fn(session)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; callers already saw it
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers}
+
+
+reads = SingleFlight()
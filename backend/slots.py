@@ -0,0 +1,131 @@
+"""Order capacity per (pickup location, time slot).
+
+An admin sets how many orders a location can hand out in a slot; that is
+a ``slot_capacities`` row.  Booking is one conditional
+``UPDATE ... SET booked = booked + 1 WHERE booked < capacity`` in the
+order's transaction, like the stock claim in ``inventory``, so concurrent
+orders can't overfill a slot.  A full slot rejects the order with 409 and
+suggests the least-loaded slot at the same location that still has room.
+
+Pairs without a row are unlimited and their orders aren't counted until
+a capacity is set; the new row then starts from the orders already placed.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, and_, cast, func, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Order, PickupLocation, SlotCapacity, TimeSlot
+
+
+def _pair(location_id: int, slot_id: int) -> tuple:
+    return SlotCapacity.pickup_location_id == location_id, SlotCapacity.time_slot_id == slot_id
+
+
+async def book_slot(db: AsyncSession, location_id: Optional[int], slot_id: Optional[int]) -> None:
+    """Count one order against *slot_id* at *location_id*; 409 if it is full."""
+    if location_id is None or slot_id is None:
+        return  # free-text location or slot: nothing to count against
+    booked = await db.execute(
+        update(SlotCapacity)
+        .where(*_pair(location_id, slot_id), SlotCapacity.booked < SlotCapacity.capacity)
+        .values(booked=SlotCapacity.booked + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if booked.rowcount:
+        return
+    if await db.scalar(select(SlotCapacity.id).where(*_pair(location_id, slot_id))) is None:
+        return  # no capacity set for this pair
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "This pickup time is full",
+            "suggested_time_slot": await least_loaded_slot(db, location_id, exclude=slot_id),
+        },
+    )
+
+
+def _availability_query():
+    # Every location x slot pair, with its capacity row if there is one
+    return (
+        select(
+            PickupLocation.id.label("pickup_location_id"),
+            PickupLocation.name.label("pickup_location"),
+            TimeSlot.id.label("time_slot_id"),
+            TimeSlot.time.label("time_slot"),
+            SlotCapacity.capacity,
+            SlotCapacity.booked,
+        )
+        .select_from(PickupLocation)
+        .join(TimeSlot, true())
+        .outerjoin(
+            SlotCapacity,
+            and_(SlotCapacity.pickup_location_id == PickupLocation.id, SlotCapacity.time_slot_id == TimeSlot.id),
+        )
+    )
+
+
+async def least_loaded_slot(db: AsyncSession, location_id: int, exclude: Optional[int] = None) -> Optional[str]:
+    """Label of the slot at *location_id* with room and the lowest booked/capacity ratio.
+
+    Unlimited slots count as empty.
+    """
+    load = func.coalesce(cast(SlotCapacity.booked, Float) / func.nullif(SlotCapacity.capacity, 0), 0.0)
+    query = (
+        _availability_query()
+        .where(
+            PickupLocation.id == location_id,
+            (SlotCapacity.id.is_(None)) | (SlotCapacity.booked < SlotCapacity.capacity),
+        )
+        .order_by(load, TimeSlot.id)
+        .limit(1)
+    )
+    if exclude is not None:
+        query = query.where(TimeSlot.id != exclude)
+    row = (await db.execute(query)).first()
+    return row.time_slot if row else None
+
+
+def _with_remaining(row) -> dict:
+    values = dict(row._mapping)
+    values["remaining"] = None if row.capacity is None else max(0, row.capacity - row.booked)
+    return values
+
+
+async def availability(db: AsyncSession) -> List[dict]:
+    """Capacity, bookings and room left for every location x slot pair."""
+    rows = await db.execute(_availability_query().order_by(PickupLocation.id, TimeSlot.id))
+    return [_with_remaining(row) for row in rows]
+
+
+async def _placed_orders(db: AsyncSession, location_id: int, slot_id: int) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(Order).where(
+            Order.pickup_location_id == location_id,
+            Order.time_slot_id == slot_id,
+            func.coalesce(Order.status, "") != "cancelled",
+        )
+    )
+
+
+async def set_capacity(db: AsyncSession, location_id: int, slot_id: int, capacity: int) -> dict:
+    """Create or change the capacity of one pair; bookings so far are kept.
+
+    A new row starts from the orders already placed for the pair, so a cap
+    set on a busy slot counts them rather than starting at zero.
+    """
+    row = await db.scalar(select(SlotCapacity).where(*_pair(location_id, slot_id)))
+    if row is None:
+        booked = await _placed_orders(db, location_id, slot_id)
+        db.add(SlotCapacity(pickup_location_id=location_id, time_slot_id=slot_id, capacity=capacity, booked=booked))
+    else:
+        row.capacity = capacity
+    await db.commit()
+    pair = (await db.execute(
+        _availability_query().where(PickupLocation.id == location_id, TimeSlot.id == slot_id)
+    )).one()
+    return _with_remaining(pair)
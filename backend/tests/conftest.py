@@ -0,0 +1,68 @@
+"""Shared fixtures: the app against a throwaway SQLite database.
+
+``DATABASE_URL`` has to be set before ``backend`` is imported, because the
+engine is created at import time.  Tests share the database, so each one
+registers its own users.
+
+    python -m pytest backend/tests
+"""
+
+import os
+import tempfile
+import uuid
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='streetmeat-tests-')}/test.db"
+os.environ["GOOGLE_SHEET_ID"] = ""  # keep the Sheets export off
+# Every test client shares one address; tests that exercise the limits set their own
+os.environ["REGISTER_RATE_PER_IP_PER_MINUTE"] = "100000"
+os.environ["LOGIN_RATE_PER_IP_PER_MINUTE"] = "100000"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from backend.database import AsyncSessionLocal  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.models import User  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+# One app start per run: shutdown closes the password hasher's thread pool
+@pytest.fixture(scope="session")
+async def client():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture
+def register(client):
+    """Sign up a fresh user; return the /auth/register response body."""
+    async def register(name: str = "Tester") -> dict:
+        email = f"{uuid.uuid4().hex[:12]}@example.com"
+        response = await client.post(
+            "/api/auth/register", json={"name": name, "email": email, "password": "password1"}
+        )
+        assert response.status_code == 200, response.text
+        return {**response.json(), "email": email}
+    return register
+
+
+@pytest.fixture
+async def admin(register) -> dict:
+    """Auth headers of a fresh admin user."""
+    tokens = await register("Admin")
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.email == tokens["email"]))
+        user.is_admin = True
+        await db.commit()
+    return bearer(tokens)
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
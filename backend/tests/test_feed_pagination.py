@@ -0,0 +1,50 @@
+"""Keyset pagination of GET /api/social/posts."""
+
+import uuid
+
+import pytest
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+async def _pages(client, location: str, limit: int) -> list:
+    pages, cursor = [], None
+    while True:
+        params = {"location_filter": location, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/social/posts", params=params)).json()
+        pages.append([post["content"] for post in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+async def test_pages_walk_the_feed_newest_first(client, register):
+    headers = bearer(await register())
+    location = uuid.uuid4().hex
+    for n in range(5):
+        await client.post("/api/social/posts", json={"content": f"p{n}", "location_filter": location}, headers=headers)
+
+    assert await _pages(client, location, limit=2) == [["p4", "p3"], ["p2", "p1"], ["p0"]]
+
+
+async def test_new_posts_do_not_shift_later_pages(client, register):
+    headers = bearer(await register())
+    location = uuid.uuid4().hex
+    for n in range(4):
+        await client.post("/api/social/posts", json={"content": f"p{n}", "location_filter": location}, headers=headers)
+
+    first = (await client.get("/api/social/posts", params={"location_filter": location, "limit": 2})).json()
+    await client.post("/api/social/posts", json={"content": "late", "location_filter": location}, headers=headers)
+    second = (await client.get(
+        "/api/social/posts", params={"location_filter": location, "limit": 2, "cursor": first["next_cursor"]}
+    )).json()
+
+    assert [post["content"] for post in first["items"]] == ["p3", "p2"]
+    assert [post["content"] for post in second["items"]] == ["p1", "p0"]
+
+
+async def test_malformed_cursor_is_a_400(client):
+    response = await client.get("/api/social/posts", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
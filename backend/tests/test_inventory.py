@@ -0,0 +1,41 @@
+"""Stock claims: concurrent orders never take more units than there are."""
+
+import asyncio
+import uuid
+
+import pytest
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+async def _stocked_item(client, admin, stock) -> dict:
+    item = {"name": f"dog {uuid.uuid4().hex[:8]}", "price": "5", "stock_remaining": stock}
+    response = await client.post("/api/menu", json=item, headers=admin)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _order(item_id: int) -> dict:
+    return {"menu_item_id": item_id, "pickup_location": "Anywhere", "time_slot": "Whenever"}
+
+
+async def test_concurrent_orders_stop_at_zero(client, admin, register):
+    item = await _stocked_item(client, admin, stock=3)
+    buyers = [bearer(await register()) for _ in range(8)]
+
+    responses = await asyncio.gather(
+        *(client.post("/api/orders", json=_order(item["id"]), headers=buyer) for buyer in buyers)
+    )
+
+    assert sorted(response.status_code for response in responses) == [201] * 3 + [409] * 5
+    menu = (await client.get("/api/menu/today")).json()
+    assert item["id"] not in [entry["id"] for entry in menu]
+
+
+async def test_untracked_items_never_sell_out(client, admin, register):
+    item = await _stocked_item(client, admin, stock=None)
+    buyer = bearer(await register())
+    for _ in range(3):
+        assert (await client.post("/api/orders", json=_order(item["id"]), headers=buyer)).status_code == 201
@@ -0,0 +1,97 @@
+"""Write-behind post likes: toggles are buffered and land on the next flush."""
+
+import pytest
+from sqlalchemy import func, select
+
+from backend import feed_loader
+from backend.database import AsyncSessionLocal
+from backend.like_buffer import LikeBuffer
+from backend.models import Post, User, post_likes
+from backend.routes import social_feed
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    """An enabled buffer that only flushes when a test says so."""
+    buffer = LikeBuffer(enabled=True, flush_interval=3600)
+    monkeypatch.setattr(social_feed, "like_buffer", buffer)
+    monkeypatch.setattr(feed_loader, "like_buffer", buffer)
+    return buffer
+
+
+async def _post(client, register):
+    author = bearer(await register())
+    post = (await client.post("/api/social/posts", json={"content": "buffered"}, headers=author)).json()
+    return f"/api/social/posts/{post['id']}/like", post["id"]
+
+
+async def _user_id(tokens: dict) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User.id).where(User.email == tokens["email"]))
+
+
+async def _stored(post_id: int):
+    """(likes_count column, liking user ids) as the database holds them."""
+    async with AsyncSessionLocal() as db:
+        count = await db.scalar(select(Post.likes_count).where(Post.id == post_id))
+        users = set((await db.scalars(select(post_likes.c.user_id).where(post_likes.c.post_id == post_id))).all())
+        assert count == len(users) == await db.scalar(
+            select(func.count()).select_from(post_likes).where(post_likes.c.post_id == post_id)
+        )
+        return count, users
+
+
+async def test_toggle_back_before_flush_writes_nothing(client, register, buffer):
+    like, post_id = await _post(client, register)
+    fan = bearer(await register())
+
+    assert (await client.post(like, headers=fan)).json() == {"liked": True, "likes_count": 1}
+    assert (await client.post(like, headers=fan)).json() == {"liked": False, "likes_count": 0}
+    await buffer.flush()
+
+    assert buffer.rows_written == 0
+    assert await _stored(post_id) == (0, set())
+
+
+async def test_failed_flush_keeps_toggles_for_the_next_one(client, register, buffer, monkeypatch):
+    like, post_id = await _post(client, register)
+    first, second = await register(), await register()
+
+    write = buffer._write
+
+    async def down_once(batch):
+        monkeypatch.setattr(buffer, "_write", write)
+        raise RuntimeError("database down")
+
+    await client.post(like, headers=bearer(first))
+    await client.post(like, headers=bearer(second))
+    monkeypatch.setattr(buffer, "_write", down_once)
+    with pytest.raises(RuntimeError):
+        await buffer.flush()
+
+    assert buffer.stats()["pending"] == 2 and buffer.failures == 1
+    assert await _stored(post_id) == (0, set())
+
+    # The restored likes still count; this unlike cancels one of them
+    assert (await client.post(like, headers=bearer(second))).json() == {"liked": False, "likes_count": 1}
+    await buffer.flush()
+
+    assert buffer.rows_written == 1
+    assert await _stored(post_id) == (1, {await _user_id(first)})
+
+
+async def test_stop_flushes_pending_toggles(client, register, buffer):
+    like, post_id = await _post(client, register)
+    fan = await register()
+    buffer.start()
+
+    assert (await client.post(like, headers=bearer(fan))).json() == {"liked": True, "likes_count": 1}
+    assert await _stored(post_id) == (0, set())
+    await buffer.stop()
+
+    assert buffer.stats()["pending"] == 0
+    assert await _stored(post_id) == (1, {await _user_id(fan)})
@@ -0,0 +1,39 @@
+"""Single-statement like toggles on posts and comments."""
+
+import pytest
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_post_like_toggles_and_counts(client, register):
+    author, fan = bearer(await register()), bearer(await register())
+    post = (await client.post("/api/social/posts", json={"content": "like me"}, headers=author)).json()
+    like = f"/api/social/posts/{post['id']}/like"
+
+    assert (await client.post(like, headers=fan)).json() == {"liked": True, "likes_count": 1}
+    assert (await client.post(like, headers=author)).json() == {"liked": True, "likes_count": 2}
+    assert (await client.post(like, headers=fan)).json() == {"liked": False, "likes_count": 1}
+
+    seen_by_fan = (await client.get(f"/api/social/posts/{post['id']}", headers=fan)).json()
+    seen_by_author = (await client.get(f"/api/social/posts/{post['id']}", headers=author)).json()
+    assert (seen_by_fan["is_liked_by_user"], seen_by_author["is_liked_by_user"]) == (False, True)
+    assert seen_by_author["likes_count"] == 1
+
+
+async def test_comment_like_toggles(client, register):
+    headers = bearer(await register())
+    post = (await client.post("/api/social/posts", json={"content": "thread"}, headers=headers)).json()
+    comment = (await client.post(
+        f"/api/social/posts/{post['id']}/comments", json={"content": "reply"}, headers=headers
+    )).json()
+    like = f"/api/social/comments/{comment['id']}/like"
+
+    assert (await client.post(like, headers=headers)).json() == {"liked": True, "likes_count": 1}
+    assert (await client.post(like, headers=headers)).json() == {"liked": False, "likes_count": 0}
+
+
+async def test_liking_a_missing_post_is_a_404(client, register):
+    headers = bearer(await register())
+    assert (await client.post("/api/social/posts/987654/like", headers=headers)).status_code == 404
@@ -0,0 +1,98 @@
+"""Outbox claiming: every row is delivered once, failures back off, leases expire."""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from backend import outbox
+from backend.database import AsyncSessionLocal
+from backend.models import OutboxEvent
+
+pytestmark = pytest.mark.anyio
+
+TOPIC = "test.recorded"
+
+
+@pytest.fixture
+async def sink(client, monkeypatch):
+    """A recording sink for TOPIC, with the app's own dispatcher paused."""
+    delivered, failing = [], []
+
+    async def deliver(payloads):
+        if failing:
+            raise RuntimeError("sink down")
+        await asyncio.sleep(0)  # let a concurrent dispatcher run in between
+        delivered.extend(payload["n"] for payload in payloads)
+
+    monkeypatch.setitem(outbox.SINKS, TOPIC, outbox.Sink(deliver))
+    await outbox.outbox_dispatcher.stop()
+    yield delivered, failing
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(OutboxEvent).where(OutboxEvent.topic == TOPIC))
+        await db.commit()
+    outbox.outbox_dispatcher.start()
+
+
+async def _publish(count: int) -> None:
+    async with AsyncSessionLocal() as db:
+        for n in range(count):
+            outbox.publish(db, TOPIC, {"n": n})
+        await db.commit()
+
+
+async def _rows() -> list:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(OutboxEvent).where(OutboxEvent.topic == TOPIC))).scalars().all()
+
+
+async def test_concurrent_dispatchers_deliver_each_row_once(sink):
+    delivered, _ = sink
+    await _publish(50)
+    dispatchers = [outbox.OutboxDispatcher(batch_size=7) for _ in range(3)]
+
+    async def drain(dispatcher):
+        while await dispatcher.dispatch_once():
+            pass
+
+    await asyncio.gather(*(drain(dispatcher) for dispatcher in dispatchers))
+
+    assert sorted(delivered) == list(range(50))
+    assert await _rows() == []
+
+
+async def test_failed_delivery_backs_off_and_releases_the_lease(sink):
+    delivered, failing = sink
+    failing.append(True)
+    await _publish(3)
+    dispatcher = outbox.OutboxDispatcher()
+
+    assert await dispatcher.dispatch_once() == 3
+    rows = await _rows()
+    assert [(row.attempts, row.lease_owner, row.leased_until) for row in rows] == [(1, None, None)] * 3
+    assert all("sink down" in row.last_error for row in rows)
+    # Backed off: not due again yet
+    assert await dispatcher.dispatch_once() == 0
+    assert delivered == []
+
+
+async def test_expired_lease_can_be_reclaimed(sink):
+    delivered, _ = sink
+    await _publish(2)
+    crashed = outbox.OutboxDispatcher(lease=60)
+    async with AsyncSessionLocal() as db:
+        assert len(await crashed._claim(db)) == 2  # claimed, then never delivered
+
+    survivor = outbox.OutboxDispatcher()
+    assert await survivor.dispatch_once() == 0  # still leased
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.topic == TOPIC)
+            .values(leased_until=outbox._now() - timedelta(seconds=1))
+        )
+        await db.commit()
+    assert await survivor.dispatch_once() == 2
+    assert sorted(delivered) == [0, 1]
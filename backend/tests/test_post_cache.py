@@ -0,0 +1,46 @@
+"""The serialised-post cache must not outlive the post it was built from."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.schemas import PostWithLikeStatus
+from backend.serialization import post_bytes, post_json
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_deleted_post_id_reuse_serves_the_new_post(client, register):
+    headers = bearer(await register())
+    await client.post("/api/social/posts", json={"content": "first"}, headers=headers)
+    old = (await client.post("/api/social/posts", json={"content": "OLD secret"}, headers=headers)).json()
+
+    # Warm the cache for the post that is about to go
+    assert (await client.get(f"/api/social/posts/{old['id']}", headers=headers)).json()["content"] == "OLD secret"
+    await client.get("/api/social/posts", headers=headers)
+
+    assert (await client.delete(f"/api/social/posts/{old['id']}", headers=headers)).status_code == 200
+    new = (await client.post("/api/social/posts", json={"content": "new"}, headers=headers)).json()
+    assert new["id"] == old["id"]  # SQLite hands the id out again
+
+    assert (await client.get(f"/api/social/posts/{new['id']}", headers=headers)).json()["content"] == "new"
+    feed = (await client.get("/api/social/posts", headers=headers)).json()["items"]
+    assert "OLD secret" not in [post["content"] for post in feed]
+
+
+def _post(content: str, created_at: datetime) -> PostWithLikeStatus:
+    author = {"id": 1, "name": "A", "email": "a@example.com", "is_admin": False, "created_at": created_at}
+    return PostWithLikeStatus(
+        id=999_999, content=content, author_id=1, author=author, created_at=created_at,
+        likes_count=0, comments_count=0, version=1,
+    )
+
+
+def test_cache_key_tells_reused_ids_apart():
+    # Another worker never sees the delete, so the key itself must differ
+    created = datetime(2024, 5, 1, 21, 30, tzinfo=timezone.utc)
+    assert b"OLD secret" in post_json(_post("OLD secret", created))
+    assert b"new" in post_json(_post("new", created + timedelta(seconds=1)))
+    post_bytes.discard(lambda key: key[0] == 999_999)
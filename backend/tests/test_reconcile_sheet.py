@@ -0,0 +1,71 @@
+"""The Sheets reconcile job against the in-memory fake sheet."""
+
+import uuid
+
+import pytest
+
+from backend.database import AsyncSessionLocal
+from backend.google_sheets import ORDER_COLUMNS
+from backend.reconcile_sheet import load_order_rows, reconcile
+from backend.sheets_fake import FakeValues
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def orders(client, admin, register) -> dict:
+    """Order id -> expected sheet row, for every order in the test database."""
+    item = (await client.post("/api/menu", json={"name": f"dog {uuid.uuid4().hex[:8]}", "price": "5"}, headers=admin)).json()
+    buyer = bearer(await register())
+    for _ in range(4):
+        await client.post(
+            "/api/orders",
+            json={"menu_item_id": item["id"], "pickup_location": "Anywhere", "time_slot": "Whenever"},
+            headers=buyer,
+        )
+    async with AsyncSessionLocal() as db:
+        return await load_order_rows(db)
+
+
+async def _reconcile(values: FakeValues):
+    async with AsyncSessionLocal() as db:
+        return await reconcile(db, values, "sheet-id")
+
+
+async def test_reconcile_repairs_the_sheet_in_one_call(orders):
+    ids = sorted(orders)
+    changed, duplicated, missing = ids[0], ids[1], ids[-1]
+    stale = list(orders[changed])
+    stale[-1] = "stale status"
+    legacy = ["2024-05-01T21:30:00.123456", "Old Name", "Old Dog", "", "Old Cart"]
+    note = ["Pickup notes: bring ID"]
+    sheet = [list(ORDER_COLUMNS), legacy, note, stale]
+    sheet += [orders[order_id] for order_id in ids if order_id not in (changed, missing)]
+    sheet.append(orders[duplicated])
+    values = FakeValues(sheet)
+
+    plan = await _reconcile(values)
+
+    assert (len(plan.updates), plan.duplicates, len(plan.appends)) == (2, 1, 1)
+    assert (plan.unknown, plan.legacy, plan.unchanged) == (2, 1, len(ids) - 2)
+    assert values.calls == {"get": 1, "batchUpdate": 1}
+    rows = values.get(spreadsheetId="sheet-id", range="Sheet1!A:H").execute()["values"]
+    assert rows[:3] == [list(ORDER_COLUMNS), legacy, note]
+    assert rows[3] == orders[changed]  # rewritten in place
+    assert rows[len(sheet) - 1] == []  # the duplicate, blanked
+    assert rows[len(sheet)] == orders[missing]  # appended after the last row
+
+
+async def test_second_run_writes_nothing(orders):
+    values = FakeValues()
+    first = await _reconcile(values)
+    assert len(first.appends) == len(orders) + 1  # header too
+    assert values.calls["batchUpdate"] == 1
+
+    second = await _reconcile(values)
+
+    assert (second.updates, second.appends, second.calls) == ({}, [], 0)
+    assert second.unchanged == len(orders)
+    assert values.calls["batchUpdate"] == 1
@@ -0,0 +1,80 @@
+"""Refresh token rotation, reuse detection and cleanup of dead rows."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from backend.auth import purge_refresh_tokens
+from backend.database import AsyncSessionLocal
+from backend.models import RefreshToken, User
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+async def _refresh(client, token: str):
+    return await client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+async def _rows(email: str) -> list:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(RefreshToken.family, RefreshToken.revoked_at.is_not(None))
+            .join(User, User.id == RefreshToken.user_id)
+            .where(User.email == email)
+            .order_by(RefreshToken.id)
+        )
+        return result.all()
+
+
+async def test_register_tokens_rotate(client, register):
+    user = await register()
+    rotated = await _refresh(client, user["refresh_token"])
+    assert rotated.status_code == 200
+    tokens = rotated.json()
+    assert tokens["refresh_token"] != user["refresh_token"]
+    assert (await client.get("/api/auth/me", headers=bearer(tokens))).status_code == 200
+    # One family, from registration; the rotated token is kept to catch reuse
+    assert [revoked for _, revoked in await _rows(user["email"])] == [True, False]
+
+
+async def test_reusing_a_rotated_token_revokes_the_session(client, register):
+    user = await register()
+    second = (await _refresh(client, user["refresh_token"])).json()["refresh_token"]
+    third = (await _refresh(client, second)).json()["refresh_token"]
+
+    assert (await _refresh(client, user["refresh_token"])).status_code == 401
+    assert (await _refresh(client, third)).status_code == 401
+
+
+async def test_sign_in_purges_dead_families(client, register):
+    user = await register()
+    logged_in = await client.post(
+        "/api/auth/login", data={"username": user["email"], "password": "password1"}
+    )
+    second = logged_in.json()["refresh_token"]
+    assert (await client.post("/api/auth/logout", json={"refresh_token": user["refresh_token"]})).status_code == 204
+
+    # The logged-out family is gone; the other one is untouched
+    rows = await _rows(user["email"])
+    assert len({family for family, _ in rows}) == 1
+    assert (await _refresh(client, second)).status_code == 200
+
+
+async def test_purge_drops_expired_rows(client, register):
+    user = await register()
+    rotated = (await _refresh(client, user["refresh_token"])).json()["refresh_token"]
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(select(User.id).where(User.email == user["email"]))
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_not(None))
+            .values(expires_at=datetime.now(timezone.utc) - timedelta(days=1))
+        )
+        assert await purge_refresh_tokens(db) >= 1
+        await db.commit()
+        left = await db.scalar(select(func.count()).where(RefreshToken.user_id == user_id))
+    assert left == 1
+    assert (await _refresh(client, rotated)).status_code == 200
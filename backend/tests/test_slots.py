@@ -0,0 +1,70 @@
+"""Slot capacity: a full pickup slot rejects orders and suggests another."""
+
+import asyncio
+import uuid
+
+import pytest
+
+from .conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_full_slot_rejects_and_suggests_the_emptiest(client, admin, register):
+    tag = uuid.uuid4().hex[:8]
+    location = (await client.post(
+        "/api/pickup-locations", json={"name": f"Cart {tag}", "address": "Main St"}, headers=admin
+    )).json()
+    busy, quiet, fuller = [
+        (await client.post("/api/time-slots", json={"time": f"{hour}:00 {tag}"}, headers=admin)).json()
+        for hour in (18, 19, 20)
+    ]
+    item = (await client.post("/api/menu", json={"name": f"dog {tag}", "price": "5"}, headers=admin)).json()
+    # Unlimited slots count as empty, so close every other slot at this location
+    capacities = {row["time_slot_id"]: 0 for row in (await client.get("/api/slot-capacity")).json()}
+    capacities.update({busy["id"]: 2, quiet["id"]: 10, fuller["id"]: 1})
+    for slot_id, capacity in capacities.items():
+        await client.put(
+            f"/api/pickup-locations/{location['id']}/time-slots/{slot_id}/capacity",
+            json={"capacity": capacity}, headers=admin,
+        )
+    order = {"menu_item_id": item["id"], "pickup_location": location["name"]}
+    buyer = bearer(await register())
+    await client.post("/api/orders", json={**order, "time_slot": fuller["time"]}, headers=buyer)
+
+    responses = await asyncio.gather(*(
+        client.post("/api/orders", json={**order, "time_slot": busy["time"]}, headers=buyer) for _ in range(4)
+    ))
+
+    assert sorted(response.status_code for response in responses) == [201, 201, 409, 409]
+    rejected = next(response for response in responses if response.status_code == 409)
+    assert rejected.json()["detail"]["suggested_time_slot"] == quiet["time"]
+
+    availability = {
+        row["time_slot_id"]: row for row in (await client.get("/api/slot-capacity")).json()
+        if row["pickup_location_id"] == location["id"]
+    }
+    assert (availability[busy["id"]]["booked"], availability[busy["id"]]["remaining"]) == (2, 0)
+    assert availability[fuller["id"]]["remaining"] == 0
+
+
+async def test_capacity_set_after_orders_counts_them(client, admin, register):
+    tag = uuid.uuid4().hex[:8]
+    location = (await client.post(
+        "/api/pickup-locations", json={"name": f"Cart {tag}", "address": "Main St"}, headers=admin
+    )).json()
+    slot = (await client.post("/api/time-slots", json={"time": f"21:00 {tag}"}, headers=admin)).json()
+    item = (await client.post("/api/menu", json={"name": f"dog {tag}", "price": "5"}, headers=admin)).json()
+    order = {"menu_item_id": item["id"], "pickup_location": location["name"], "time_slot": slot["time"]}
+    buyer = bearer(await register())
+    for _ in range(3):
+        assert (await client.post("/api/orders", json=order, headers=buyer)).status_code == 201
+
+    capacity = (await client.put(
+        f"/api/pickup-locations/{location['id']}/time-slots/{slot['id']}/capacity",
+        json={"capacity": 4}, headers=admin,
+    )).json()
+
+    assert (capacity["booked"], capacity["remaining"]) == (3, 1)
+    assert (await client.post("/api/orders", json=order, headers=buyer)).status_code == 201
+    assert (await client.post("/api/orders", json=order, headers=buyer)).status_code == 409
@@ -0,0 +1,17 @@
+"""Timestamps read back from the database.
+
+``DateTime(timezone=True)`` columns come back aware from Postgres but naive
+from SQLite, which drops the offset.  Everything is written in UTC, so a
+naive value is read as UTC.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+
+def as_utc(value: datetime) -> datetime:
+    """*value* as an aware UTC datetime."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,92 @@
+"""Per-process cache of authenticated users, keyed by id.
+
+``get_current_user`` runs on every authenticated request, so the users row
+behind a token is kept for ``USER_CACHE_TTL`` seconds in a bounded LRU.
+Each hit hands out a fresh detached ``User`` built from the cached column
+values, so no two requests share an instance.
+
+Any ORM update or delete of a user drops the entry when it is flushed and
+again once it commits.  Bulk ``update(User)`` statements bypass the mapper
+events and rely on the TTL, as do changes made by other worker processes.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from .models import User
+
+_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+class UserCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(user_id)
+        user = User(**entry[1])
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User) -> None:
+        values = {key: getattr(user, key) for key in _COLUMNS}
+        self._entries[user.id] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        if self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache(
+    max_entries=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
+    # A request may re-cache the old row before this transaction commits
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_committed_users(session: Session) -> None:
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
@@ -10,7 +10,8 @@ import {
   DropdownMenuItem,
   DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu";
-import { Comment } from "@/lib/api";
+import { Comment, socialAPI } from "@/lib/api";
+import { useToast } from "@/hooks/use-toast";
 
 interface CommentCardProps {
   comment: Comment;
@@ -37,6 +38,28 @@ const CommentCard: React.FC<CommentCardProps> = ({
   const [replyText, setReplyText] = useState("");
   const [isEditing, setIsEditing] = useState(false);
   const [editContent, setEditContent] = useState(comment.content);
+  const [moreReplies, setMoreReplies] = useState<Comment[]>([]);
+  const [repliesCursor, setRepliesCursor] = useState<string | null | undefined>(undefined);
+  const [loadingReplies, setLoadingReplies] = useState(false);
+  const { toast } = useToast();
+
+  const replies = [...(comment.replies ?? []), ...moreReplies];
+  const hiddenReplies = (comment.replies_count ?? 0) - replies.length;
+
+  const loadReplies = async () => {
+    if (loadingReplies) return;
+    const cursor = repliesCursor === undefined ? comment.replies_next_cursor : repliesCursor;
+    setLoadingReplies(true);
+    try {
+      const page = await socialAPI.getCommentReplies(comment.id, cursor ?? undefined);
+      setMoreReplies((prev) => [...prev, ...page.items]);
+      setRepliesCursor(page.next_cursor ?? null);
+    } catch (error) {
+      toast({ title: "Error", description: "Failed to load replies", variant: "destructive" });
+    } finally {
+      setLoadingReplies(false);
+    }
+  };
 
   const canEdit = currentUserId && (comment.author_id === currentUserId || isAdmin);
   const canDelete = currentUserId && (comment.author_id === currentUserId || isAdmin);
@@ -211,9 +234,9 @@ const CommentCard: React.FC<CommentCardProps> = ({
           )}
 
           {/* Nested replies */}
-          {comment.replies && comment.replies.length > 0 && (
+          {replies.length > 0 && (
             <div className="mt-3 space-y-3">
-              {comment.replies.map((reply) => (
+              {replies.map((reply) => (
                 <CommentCard
                   key={reply.id}
                   comment={reply}
@@ -228,6 +251,11 @@ const CommentCard: React.FC<CommentCardProps> = ({
               ))}
             </div>
           )}
+          {hiddenReplies > 0 && (
+            <Button variant="ghost" size="sm" onClick={loadReplies} disabled={loadingReplies} className="mt-2 text-muted-foreground">
+              View {hiddenReplies} more {hiddenReplies === 1 ? "reply" : "replies"}
+            </Button>
+          )}
         </div>
       </div>
     </div>
@@ -13,6 +13,7 @@ import {
 } from "@/components/ui/dropdown-menu";
 import { Post, Comment, socialAPI } from "@/lib/api";
 import { useToast } from '@/hooks/use-toast';
+import { usePostComments } from '@/hooks/use-post-comments';
 import CommentCard from "./CommentCard";
 
 interface PostCardProps {
@@ -20,7 +21,8 @@ interface PostCardProps {
   currentUserId?: number;
   isAdmin?: boolean;
   onLike: (postId: number) => void;
-  onComment: (postId: number, content: string) => void;
+  /** Resolves to the created comment, if the caller has it */
+  onComment: (postId: number, content: string) => Promise<Comment | void> | void;
   onEdit?: (postId: number, content: string) => void;
   onDelete?: (postId: number) => void;
 }
@@ -39,6 +41,7 @@ const PostCard: React.FC<PostCardProps> = ({
   const [isEditing, setIsEditing] = useState(false);
   const [editContent, setEditContent] = useState(post.content);
   const { toast } = useToast();
+  const thread = usePostComments(post);
 
   const canEdit = currentUserId && (post.author_id === currentUserId || isAdmin);
   const canDelete = currentUserId && (post.author_id === currentUserId || isAdmin);
@@ -49,10 +52,13 @@ const PostCard: React.FC<PostCardProps> = ({
     }
   };
 
-  const handleComment = () => {
+  const handleComment = async () => {
     if (currentUserId && commentText.trim()) {
-      onComment(post.id, commentText.trim());
+      const content = commentText.trim();
       setCommentText("");
+      // The post only previews the oldest comments, so show the new one directly
+      const comment = await onComment(post.id, content);
+      if (comment) thread.addPosted(comment);
     }
   };
 
@@ -240,9 +246,9 @@ const PostCard: React.FC<PostCardProps> = ({
         )}
 
         {/* Comments */}
-        {showComments && post.comments && post.comments.length > 0 && (
+        {showComments && thread.comments.length > 0 && (
           <div className="space-y-3 border-t pt-4">
-            {post.comments.map((comment) => (
+            {thread.comments.map((comment) => (
               <CommentCard
                 key={comment.id}
                 comment={comment}
@@ -258,6 +264,11 @@ const PostCard: React.FC<PostCardProps> = ({
                 }}
               />
             ))}
+            {thread.hasMore && (
+              <Button variant="ghost" size="sm" onClick={thread.loadMore} disabled={thread.loading} className="text-muted-foreground">
+                View more comments
+              </Button>
+            )}
           </div>
         )}
       </CardContent>
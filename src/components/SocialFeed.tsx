@@ -3,7 +3,7 @@ import { ScrollArea } from "@/components/ui/scroll-area";
 import { Button } from "@/components/ui/button";
 import { RefreshCw } from "lucide-react";
 import { useToast } from '@/hooks/use-toast';
-import { socialAPI, authAPI, Post, User, PickupLocation } from "@/lib/api";
+import { socialAPI, authAPI, Post, User, PickupLocation, Comment } from "@/lib/api";
 import PostCard from "./PostCard";
 import CreatePost from "./CreatePost";
 
@@ -119,19 +119,20 @@ const SocialFeed: React.FC<SocialFeedProps> = ({
     }
   };
 
-  const handleCommentOnPost = async (postId: number, content: string) => {
+  const handleCommentOnPost = async (postId: number, content: string): Promise<Comment | void> => {
     if (!currentUserId) return;
 
     try {
-      await socialAPI.createComment(postId, content);
+      const comment: Comment = await socialAPI.createComment(postId, content);
       
-      // Refresh posts to show the new comment
+      // Refresh posts for the new comment count; PostCard shows the comment itself
       await loadPosts();
       
       toast({
         title: "Success",
         description: "Your comment has been posted!",
       });
+      return comment;
     } catch (error) {
       console.error("Failed to create comment:", error);
       toast({
@@ -7,6 +7,7 @@ import { Heart, MessageCircle, Send } from "lucide-react";
 import { formatDistanceToNow } from "date-fns";
 import { User, Post, Comment, socialAPI } from "@/lib/api";
 import { useToast } from '@/hooks/use-toast';
+import { usePostComments } from '@/hooks/use-post-comments';
 
 interface UserGridCardProps {
   user: User;
@@ -20,6 +21,7 @@ const UserGridCard: React.FC<UserGridCardProps> = ({ user, currentUserId, locati
   const [isLoading, setIsLoading] = useState(true);
   const [isCommenting, setIsCommenting] = useState(false);
   const { toast } = useToast();
+  const thread = usePostComments(userPost);
 
   const getInitials = (name: string) => {
     return name
@@ -55,11 +57,9 @@ const UserGridCard: React.FC<UserGridCardProps> = ({ user, currentUserId, locati
 
     try {
       setIsCommenting(true);
-      await socialAPI.createComment(userPost.id, newComment.trim());
-      
-      // Refresh the post to get updated comments
-      const updatedPost = await socialAPI.createUserProfilePost(user.id, location);
-      setUserPost(updatedPost);
+      const comment: Comment = await socialAPI.createComment(userPost.id, newComment.trim());
+      // The post only previews the oldest comments, so show the new one directly
+      thread.addPosted(comment);
       setNewComment("");
       
       toast({
@@ -82,11 +82,8 @@ const UserGridCard: React.FC<UserGridCardProps> = ({ user, currentUserId, locati
     if (!currentUserId || !userPost) return;
 
     try {
-      await socialAPI.likeComment(userPost.id, commentId);
-      
-      // Refresh the post to get updated likes
-      const updatedPost = await socialAPI.createUserProfilePost(user.id, location);
-      setUserPost(updatedPost);
+      const { liked, likes_count } = await socialAPI.likeComment(userPost.id, commentId);
+      thread.patchComment(commentId, { is_liked_by_user: liked, likes_count });
     } catch (error) {
       console.error('Failed to like comment:', error);
       toast({
@@ -142,8 +139,8 @@ const UserGridCard: React.FC<UserGridCardProps> = ({ user, currentUserId, locati
       <CardContent className="pt-0">
         {/* Comments Section */}
         <div className="space-y-3">
-          {userPost?.comments && userPost.comments.length > 0 ? (
-            userPost.comments.map((comment) => (
+          {thread.comments.length > 0 ? (
+            thread.comments.map((comment) => (
               <div key={comment.id} className="border-l-2 border-muted pl-3 py-2">
                 <div className="flex items-start space-x-2">
                   <Avatar className="h-6 w-6">
@@ -185,6 +182,17 @@ const UserGridCard: React.FC<UserGridCardProps> = ({ user, currentUserId, locati
               No comments yet. Be the first to say hi!
             </p>
           )}
+          {thread.hasMore && (
+            <Button
+              variant="ghost"
+              size="sm"
+              onClick={thread.loadMore}
+              disabled={thread.loading}
+              className="h-7 text-xs text-muted-foreground"
+            >
+              View more comments
+            </Button>
+          )}
         </div>
 
         {/* Add Comment */}
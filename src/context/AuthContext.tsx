@@ -34,6 +34,16 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
   const navigate = useNavigate();
   const { toast } = useToast();
 
+  // The api interceptor has already tried the refresh token by the time a
+  // 401 gets here; other errors (offline, 5xx) keep the session
+  const signOutIfUnauthorized = (error: any) => {
+    if (error?.response?.status === 401) {
+      localStorage.removeItem('token');
+      localStorage.removeItem('refresh_token');
+      setToken(null);
+    }
+  };
+
   useEffect(() => {
     const token = localStorage.getItem('token');
     if (token) {
@@ -52,13 +62,9 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
                 localStorage.setItem("user_pickup_location", orders[0].pickup_location);
               }
             })
-            .catch(() => {
-              localStorage.removeItem('token');
-            });
-        })
-        .catch(() => {
-          localStorage.removeItem('token');
+            .catch(signOutIfUnauthorized);
         })
+        .catch(signOutIfUnauthorized)
         .finally(() => {
           setIsLoading(false);
         });
@@ -94,9 +100,8 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
 
   const register = async (name: string, email: string, password: string) => {
     try {
-      const response = await authAPI.register({ name, email, password });
-      const loginResponse = await authAPI.login(email, password);
-      login(loginResponse.access_token);
+      const { access_token } = await authAPI.register({ name, email, password });
+      await login(access_token);
       
       toast({
         title: "Welcome!",
@@ -127,6 +132,7 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
   };
 
   const logout = () => {
+    authAPI.logout();
     localStorage.removeItem('token');
     localStorage.removeItem("user_pickup_location");
     setUser(null);
@@ -0,0 +1,47 @@
+import { useState } from "react";
+import { Comment, Post, socialAPI } from "@/lib/api";
+import { useToast } from "@/hooks/use-toast";
+
+// The feed only carries a preview of each thread (the oldest few top-level
+// comments).  This pages through the rest and keeps comments the viewer
+// posts visible right away, wherever they fall in the thread.
+export function usePostComments(post: Post | null) {
+  const [pages, setPages] = useState<Comment[]>([]);
+  const [posted, setPosted] = useState<Comment[]>([]);
+  const [cursor, setCursor] = useState<string | null | undefined>(undefined);
+  const [loading, setLoading] = useState(false);
+  const [patches, setPatches] = useState<Record<number, Partial<Comment>>>({});
+  const { toast } = useToast();
+
+  const nextCursor = cursor === undefined ? post?.comments_next_cursor : cursor;
+
+  // A refreshed preview or a later page may contain what we already hold
+  const seen = new Set<number>();
+  const comments = [...(post?.comments ?? []), ...pages, ...posted].filter((comment) => {
+    if (seen.has(comment.id)) return false;
+    seen.add(comment.id);
+    return true;
+  }).map((comment) => (patches[comment.id] ? { ...comment, ...patches[comment.id] } : comment));
+
+  const loadMore = async () => {
+    if (!post || !nextCursor || loading) return;
+    setLoading(true);
+    try {
+      const page = await socialAPI.getPostComments(post.id, nextCursor);
+      setPages((prev) => [...prev, ...page.items]);
+      setCursor(page.next_cursor ?? null);
+    } catch (error) {
+      toast({ title: "Error", description: "Failed to load comments", variant: "destructive" });
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const addPosted = (comment: Comment) => setPosted((prev) => [...prev, comment]);
+
+  /** Apply a local change (e.g. a like toggle) without refetching the thread */
+  const patchComment = (id: number, patch: Partial<Comment>) =>
+    setPatches((prev) => ({ ...prev, [id]: { ...prev[id], ...patch } }));
+
+  return { comments, hasMore: !!nextCursor, loading, loadMore, addPosted, patchComment };
+}
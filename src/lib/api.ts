@@ -15,6 +15,48 @@ api.interceptors.request.use(cfg => {
   return cfg;
 });
 
+// Access tokens are short-lived; on a 401 swap the refresh token for a new
+// pair and retry once.  Refresh tokens are single-use, so concurrent 401s
+// share one refresh call.
+let refreshing: Promise<string | null> | null = null;
+
+const refreshAccessToken = (): Promise<string | null> => {
+  const refreshToken = localStorage.getItem("refresh_token");
+  if (!refreshToken) return Promise.resolve(null);
+  if (refreshing) return refreshing;
+  refreshing = axios
+    .post(`${api.defaults.baseURL}/auth/refresh`, { refresh_token: refreshToken })
+    .then(r => {
+      localStorage.setItem("token", r.data.access_token);
+      localStorage.setItem("refresh_token", r.data.refresh_token);
+      return r.data.access_token as string;
+    })
+    .catch(() => {
+      localStorage.removeItem("refresh_token");
+      return null;
+    })
+    .finally(() => {
+      refreshing = null;
+    });
+  return refreshing;
+};
+
+// A 401 from these means bad credentials or a dead refresh token, not an
+// expired access token, so refreshing would not help
+const NO_REFRESH_URLS = ["/auth/login", "/auth/register", "/auth/refresh", "/auth/logout"];
+
+api.interceptors.response.use(undefined, async error => {
+  const original = error.config;
+  if (error.response?.status !== 401 || !original || original._retried || NO_REFRESH_URLS.includes(original.url ?? "")) {
+    return Promise.reject(error);
+  }
+  const token = await refreshAccessToken();
+  if (!token) return Promise.reject(error);
+  original._retried = true;
+  original.headers.Authorization = `Bearer ${token}`;
+  return api(original);
+});
+
 // Types
 export interface User {
   id: number;
@@ -48,10 +90,23 @@ export interface MenuItem {
   description: string;
   price: string;
   is_available: boolean;
+  /** Units left; null when the item isn't stock-tracked */
+  stock_remaining?: number | null;
   created_at: string;
   updated_at?: string;
 }
 
+/** Capacity of one pickup location x time slot; null capacity means unlimited */
+export interface SlotAvailability {
+  pickup_location_id: number;
+  pickup_location: string;
+  time_slot_id: number;
+  time_slot: string;
+  capacity: number | null;
+  booked: number | null;
+  remaining: number | null;
+}
+
 export interface Post {
   id: number;
   content: string;
@@ -62,10 +117,17 @@ export interface Post {
   author: User;
   likes_count: number;
   comments_count: number;
+  /** First few top-level comments; page through the rest with getPostComments */
   comments: Comment[];
+  comments_next_cursor?: string | null;
   is_liked_by_user?: boolean;
 }
 
+export interface PostPage {
+  items: Post[];
+  next_cursor?: string | null;
+}
+
 export interface Comment {
   id: number;
   content: string;
@@ -76,10 +138,18 @@ export interface Comment {
   updated_at?: string;
   author: User;
   likes_count: number;
+  replies_count: number;
+  /** Empty in the feed, a preview elsewhere; page through with getCommentReplies */
   replies: Comment[];
+  replies_next_cursor?: string | null;
   is_liked_by_user?: boolean;
 }
 
+export interface CommentPage {
+  items: Comment[];
+  next_cursor?: string | null;
+}
+
 export interface PickupLocation {
   id: number;
   name: string;
@@ -100,9 +170,12 @@ export interface LikeResponse {
 
 // Auth API
 export const authAPI = {
-  /** POST /api/auth/register  — JSON body */
+  /** POST /api/auth/register  — JSON body; signs the new user in */
   register: (u: { name: string; email: string; password: string }) =>
-    api.post("/auth/register", u).then(r => r.data),
+    api.post("/auth/register", u).then(r => {
+      if (r.data.refresh_token) localStorage.setItem("refresh_token", r.data.refresh_token);
+      return { access_token: r.data.access_token };
+    }),
 
   /** POST /api/auth/login  — x-www-form-urlencoded */
   login: (email: string, password: string) =>
@@ -112,7 +185,19 @@ export const authAPI = {
         new URLSearchParams({ username: email, password }),
         { headers: { "Content-Type": "application/x-www-form-urlencoded" } }
       )
-      .then(r => ({ access_token: r.data.access_token })),
+      .then(r => {
+        if (r.data.refresh_token) localStorage.setItem("refresh_token", r.data.refresh_token);
+        return { access_token: r.data.access_token };
+      }),
+
+  /** POST /api/auth/logout — revokes the refresh token's session */
+  logout: async () => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    localStorage.removeItem("refresh_token");
+    if (refreshToken) {
+      await api.post("/auth/logout", { refresh_token: refreshToken }).catch(() => undefined);
+    }
+  },
 
   /** GET /api/auth/me  */
   getCurrentUser: () => api.get("/auth/me").then(r => r.data),
@@ -152,15 +237,23 @@ export const menuAPI = {
   getOrder: (orderId: number) => api.get(`/orders/${orderId}`).then(res => res.data),
   getPickupLocations: () => api.get('/pickup-locations').then(res => res.data),
   getTimeSlots: () => api.get('/time-slots').then(res => res.data),
+  getSlotCapacity: (): Promise<SlotAvailability[]> => api.get('/slot-capacity').then(res => res.data),
 };
 
 // Social Feed API
 export const socialAPI = {
-  getPosts: async (locationFilter?: string, userId?: number) => {
+  getPosts: async (locationFilter?: string, userId?: number, cursor?: string) => {
+    const page = await socialAPI.getPostsPage(locationFilter, userId, cursor);
+    return page.items;
+  },
+
+  /** GET /api/social/posts — keyset page; pass next_cursor back to continue */
+  getPostsPage: async (locationFilter?: string, userId?: number, cursor?: string): Promise<PostPage> => {
     const response = await api.get('/social/posts', {
       params: {
         location_filter: locationFilter,
         user_id: userId,
+        cursor,
       },
     });
     return response.data;
@@ -186,13 +279,25 @@ export const socialAPI = {
     return response.data;
   },
 
+  /** GET /api/social/posts/:id/comments — top-level comments, oldest first, with `depth` levels of replies */
+  getPostComments: async (postId: number, cursor?: string, depth?: number): Promise<CommentPage> => {
+    const response = await api.get(`/social/posts/${postId}/comments`, { params: { cursor, depth } });
+    return response.data;
+  },
+
+  /** GET /api/social/comments/:id/replies — direct replies, oldest first, with `depth` levels below */
+  getCommentReplies: async (commentId: number, cursor?: string, depth?: number): Promise<CommentPage> => {
+    const response = await api.get(`/social/comments/${commentId}/replies`, { params: { cursor, depth } });
+    return response.data;
+  },
+
   createComment: async (postId: number, content: string, parentId?: number) => {
     const response = await api.post(`/social/posts/${postId}/comments`, { content, parent_id: parentId });
     return response.data;
   },
 
-  likeComment: async (postId: number, commentId: number) => {
-    const response = await api.post(`/social/posts/${postId}/comments/${commentId}/like`);
+  likeComment: async (postId: number, commentId: number): Promise<{ liked: boolean; likes_count: number }> => {
+    const response = await api.post(`/social/comments/${commentId}/like`);
     return response.data;
   },
 
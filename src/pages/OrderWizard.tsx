@@ -133,11 +133,21 @@ const OrderWizard: React.FC = () => {
       });
 
       navigate('/community');
-    } catch (error) {
+    } catch (error: any) {
       console.error('Failed to create order:', error);
+      const detail = error.response?.data?.detail;
+      // A full pickup time comes back with the least-loaded alternative
+      const suggested: string | undefined = detail?.suggested_time_slot;
+      if (suggested) {
+        setSelectedTimeSlot(suggested);
+      }
       toast({
         title: "Error",
-        description: "Failed to place order. Please try again.",
+        description: typeof detail === "string"
+          ? detail
+          : detail?.message
+            ? `${detail.message}.${suggested ? ` ${suggested} still has room and is now selected.` : ""}`
+            : "Failed to place order. Please try again.",
         variant: "destructive",
       });
     }
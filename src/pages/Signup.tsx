@@ -35,12 +35,9 @@ const Signup = () => {
     try {
       console.log('Attempting to register user...');
       console.log('Registration data:', { name, email, password: '***' });
-      const response = await authAPI.register({ name, email, password });
-      console.log('Registration response:', response);
-      console.log('Registration successful, attempting to login...');
-      
-      // Login after successful registration
-      const { access_token } = await authAPI.login(email, password);
+      // Registration returns a token pair, so the user is signed in already
+      const { access_token } = await authAPI.register({ name, email, password });
+      console.log('Registration successful');
       await login(access_token);
 
       const orders = await authAPI.getMyOrders();